@@ -223,7 +223,7 @@ def test_verse_alignment(tr_df, n1904_df):
     print("=" * 70)
 
     # Group by verse
-    tr_verses = tr_df.groupby(["book", "chapter", "verse"]).size()
+    tr_verses = tr_df.groupby(["book", "chapter", "verse"], observed=True).size()
     n1904_verses = n1904_df.groupby(["book", "chapter", "verse"]).size()
 
     # Find matching verses
@@ -295,7 +295,7 @@ def test_tr_only_content(tr_df, n1904_df):
 
     # Show distribution of TR-only content by book
     print("\n  TR-only words by book:")
-    tr_only_by_book = tr_only.groupby("book").size().sort_values(ascending=False)
+    tr_only_by_book = tr_only.groupby("book", observed=True).size().sort_values(ascending=False)
     for book, count in tr_only_by_book.head(10).items():
         print(f"    {book}: {count:,}")
 
@@ -16,7 +16,7 @@ import argparse
 import sys
 from difflib import SequenceMatcher
 from pathlib import Path
-from typing import List, Tuple, Dict, Any
+from typing import Any, Dict, Hashable, List, Sequence, Tuple
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
@@ -63,6 +63,85 @@ def create_word_key(row: Dict[str, Any], match_criteria: List[str]) -> str:
     return "|".join(parts)
 
 
+def build_word_keys(df, match_criteria: List[str]):
+    """
+    Create comparison keys for every row of a words DataFrame.
+
+    Vectorized equivalent of applying create_word_key() to each row, done
+    entirely in Arrow compute kernels (NFC normalization and "|" joining).
+
+    Args:
+        df: Words DataFrame
+        match_criteria: List of feature names to include in key
+
+    Returns:
+        pyarrow StringArray of keys, one per row of df
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    parts = []
+    for criterion in match_criteria:
+        if criterion in df.columns:
+            values = df[criterion]
+            if not pd.api.types.is_string_dtype(values):
+                # Non-string features compare by str(value); missing stays empty
+                values = values.astype(str).where(values.notna())
+            col = pa.Array.from_pandas(values, type=pa.string())
+            if isinstance(col, pa.ChunkedArray):
+                col = col.combine_chunks()
+            parts.append(pc.fill_null(pc.utf8_normalize(col, "NFC"), ""))
+        else:
+            parts.append(pa.array([""] * len(df), type=pa.string()))
+
+    if len(parts) == 1:
+        return parts[0]
+    return pc.binary_join_element_wise(*parts, "|")
+
+
+def align_key_sequences(
+    tr_keys: Sequence[Hashable],
+    n1904_keys: Sequence[Hashable],
+) -> Tuple[List[Tuple[int, int]], List[int], List[int]]:
+    """
+    Align two precomputed word-key sequences for a single verse.
+
+    Args:
+        tr_keys: Comparison keys of the TR words, in verse order
+        n1904_keys: Comparison keys of the N1904 words, in verse order
+
+    Returns:
+        Same tuple as align_verse_words()
+    """
+    # Use SequenceMatcher for alignment
+    matcher = SequenceMatcher(None, tr_keys, n1904_keys)
+
+    alignments = []
+    # Matched indices are tracked as bitmasks (bit i set = word i matched).
+    # Python ints are arbitrary precision, so this works for any verse length.
+    tr_mask = 0
+    n1904_mask = 0
+
+    # Get matching blocks
+    for block in matcher.get_matching_blocks():
+        tr_start, n1904_start, size = block
+        if size == 0:
+            continue
+        alignments.extend(
+            zip(range(tr_start, tr_start + size), range(n1904_start, n1904_start + size))
+        )
+        run = (1 << size) - 1
+        tr_mask |= run << tr_start
+        n1904_mask |= run << n1904_start
+
+    # Find gaps
+    tr_gaps = [i for i in range(len(tr_keys)) if not (tr_mask >> i) & 1]
+    n1904_gaps = [i for i in range(len(n1904_keys)) if not (n1904_mask >> i) & 1]
+
+    return alignments, tr_gaps, n1904_gaps
+
+
 def align_verse_words(
     tr_words: List[Dict],
     n1904_words: List[Dict],
@@ -88,28 +167,7 @@ def align_verse_words(
     tr_keys = [create_word_key(w, match_criteria) for w in tr_words]
     n1904_keys = [create_word_key(w, match_criteria) for w in n1904_words]
 
-    # Use SequenceMatcher for alignment
-    matcher = SequenceMatcher(None, tr_keys, n1904_keys)
-
-    alignments = []
-    tr_matched = set()
-    n1904_matched = set()
-
-    # Get matching blocks
-    for block in matcher.get_matching_blocks():
-        tr_start, n1904_start, size = block
-        for i in range(size):
-            tr_idx = tr_start + i
-            n1904_idx = n1904_start + i
-            alignments.append((tr_idx, n1904_idx))
-            tr_matched.add(tr_idx)
-            n1904_matched.add(n1904_idx)
-
-    # Find gaps
-    tr_gaps = [i for i in range(len(tr_words)) if i not in tr_matched]
-    n1904_gaps = [i for i in range(len(n1904_words)) if i not in n1904_matched]
-
-    return alignments, tr_gaps, n1904_gaps
+    return align_key_sequences(tr_keys, n1904_keys)
 
 
 def test_alignment(config: dict) -> bool:
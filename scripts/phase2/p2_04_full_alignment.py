@@ -14,14 +14,16 @@ Usage:
 
 import argparse
 import sys
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Tuple
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from scripts.utils.config import load_config
 from scripts.utils.logging import ScriptLogger, get_logger
-from scripts.phase2.p2_02_align_verses import align_verse_words
+from scripts.phase2.p2_02_align_verses import align_key_sequences, build_word_keys
 
 
 # Book name mapping between TR and N1904
@@ -46,158 +48,246 @@ BOOK_NAME_MAP = {
 }
 
 
-def normalize_book_name(name: str) -> str:
-    """Normalize book name to N1904 format."""
-    return BOOK_NAME_MAP.get(name, name)
+# Bits reserved for the verse number in packed (chapter, verse) keys
+VERSE_BITS = 16
 
 
-def run_full_alignment(tr_df, n1904_df, config: dict) -> Tuple[List[Dict], List[Dict], Dict]:
+@lru_cache(maxsize=1 << 15)
+def align_key_ids(tr_ids: Tuple[int, ...], n1904_ids: Tuple[int, ...]) -> Tuple[Tuple, Tuple, Tuple]:
     """
-    Run alignment across all books.
+    Memoized align_key_sequences() on interned key-id tuples.
+
+    Formulaic verses repeat identical key sequences across the NT, so the
+    diff for a repeated (TR, N1904) pair is computed only once.
+
+    Returns:
+        Same as align_key_sequences(), with tuples instead of lists
+    """
+    alignments, tr_gaps, n1904_gaps = align_key_sequences(tr_ids, n1904_ids)
+    return tuple(alignments), tuple(tr_gaps), tuple(n1904_gaps)
+
+
+def build_verse_row_index(df, book_col: str = "book") -> Dict:
+    """
+    Index the row positions of every verse in a words DataFrame.
+
+    Verses are keyed by a packed int64 (chapter << VERSE_BITS | verse) so
+    per-book verse sets can be compared with NumPy set operations.
+
+    Args:
+        df: Words DataFrame with book/chapter/verse columns
+        book_col: Column holding the book name
+
+    Returns:
+        Nested dict {book: {packed_verse: ndarray of row positions}}
+    """
+    import numpy as np
+
+    chapters = df["chapter"].to_numpy(dtype=np.int64)
+    packed = (chapters << VERSE_BITS) | df["verse"].to_numpy(dtype=np.int64)
+    rows = {}
+    verse_groups = df.groupby([df[book_col].to_numpy(), packed], sort=False).indices
+    for (book, verse_key), idx in verse_groups.items():
+        rows.setdefault(book, {})[int(verse_key)] = idx
+    return rows
+
+
+# Output columns, in file order
+ALIGNMENT_COLUMNS = [
+    "tr_word_id", "n1904_node_id", "book", "chapter", "verse",
+    "tr_word_rank", "n1904_word_rank", "tr_word",
+]
+GAP_COLUMNS = ["word_id", "book", "chapter", "verse", "word_rank", "word", "gap_type"]
+
+
+def run_full_alignment(
+    tr_df, n1904_df, config: dict, alignment_path: Path, gaps_path: Path
+) -> Dict:
+    """
+    Run alignment across all books, streaming results to disk per book.
+
+    Alignments are written as one Parquet record batch per book and gaps are
+    appended to the CSV as they are found, so memory stays bounded by the
+    largest book rather than the whole NT.
 
     Args:
         tr_df: TR words DataFrame
         n1904_df: N1904 words DataFrame
         config: Pipeline config
+        alignment_path: Output path for the alignment map (Parquet)
+        gaps_path: Output path for the gaps file (CSV)
 
     Returns:
-        Tuple of (alignment_records, gap_records, statistics)
+        Statistics dict
     """
-    import pandas as pd
+    import csv
+    from collections import Counter
+
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
     from tqdm import tqdm
 
     logger = get_logger(__name__)
     match_criteria = config["alignment"]["match_criteria"]
 
-    # Add normalized book names to TR
+    # Add normalized book names to TR (one vectorized map, not one per book)
     tr_df = tr_df.copy()
-    tr_df["book_normalized"] = tr_df["book"].apply(normalize_book_name)
-
-    alignment_records = []
-    gap_records = []
+    tr_df["n1904_book"] = tr_df["book"].map(BOOK_NAME_MAP).fillna(tr_df["book"])
+
+    alignment_schema = pa.schema([
+        ("tr_word_id", pa.int64()),
+        ("n1904_node_id", pa.int64()),
+        ("book", pa.string()),
+        ("chapter", pa.int64()),
+        ("verse", pa.int64()),
+        ("tr_word_rank", pa.int64()),
+        ("n1904_word_rank", pa.int64()),
+        ("tr_word", pa.string()),
+    ])
+    alignment_cols = {col: [] for col in ALIGNMENT_COLUMNS}
+    gap_type_counts = Counter()
     book_stats = {}
-
-    # Get all unique books from TR
-    tr_books = tr_df["book"].unique()
-    logger.info(f"Processing {len(tr_books)} books...")
-
-    for tr_book in tqdm(tr_books, desc="Aligning books"):
-        n1904_book = normalize_book_name(tr_book)
-
-        # Get words for this book
-        tr_book_df = tr_df[tr_df["book"] == tr_book]
-        n1904_book_df = n1904_df[n1904_df["book"] == n1904_book]
-
-        if len(n1904_book_df) == 0:
-            logger.warning(f"No N1904 data for book: {tr_book} -> {n1904_book}")
-            # All TR words in this book are gaps
-            for _, row in tr_book_df.iterrows():
-                gap_records.append({
-                    "word_id": row["word_id"],
-                    "book": row["book"],
-                    "chapter": row["chapter"],
-                    "verse": row["verse"],
-                    "word_rank": row["word_rank"],
-                    "word": row["word"],
-                    "gap_type": "no_n1904_book",
-                })
-            continue
-
-        # Get verses
-        tr_verses = set(zip(tr_book_df["chapter"], tr_book_df["verse"]))
-        n1904_verses = set(zip(n1904_book_df["chapter"], n1904_book_df["verse"]))
-        common_verses = tr_verses & n1904_verses
-
-        book_alignments = 0
-        book_tr_gaps = 0
-
-        # Process common verses
-        for chapter, verse in common_verses:
-            tr_verse_df = tr_book_df[
-                (tr_book_df["chapter"] == chapter) & (tr_book_df["verse"] == verse)
-            ]
-            n1904_verse_df = n1904_book_df[
-                (n1904_book_df["chapter"] == chapter) & (n1904_book_df["verse"] == verse)
-            ]
-
-            tr_verse = tr_verse_df.to_dict("records")
-            n1904_verse = n1904_verse_df.to_dict("records")
-
-            alignments, tr_gaps, n1904_gaps = align_verse_words(
-                tr_verse, n1904_verse, match_criteria
+    total_aligned = 0
+
+    # Split both corpora by book in a single pass each
+    tr_groups = tr_df.groupby(["book", "n1904_book"], sort=False)
+    n1904_book_sizes = n1904_df["book"].value_counts()
+    logger.info(f"Processing {tr_groups.ngroups} books...")
+
+    # Build keys once in Arrow and intern them with one dictionary encoding
+    # over both corpora (a shared integer id space, so verses diff on ints);
+    # the verse loop only fancy-indexes these NumPy arrays by row position
+    all_keys = pa.concat_arrays([
+        build_word_keys(tr_df, match_criteria),
+        build_word_keys(n1904_df, match_criteria),
+    ])
+    key_ids = all_keys.dictionary_encode().indices.to_numpy()
+    tr_keys = key_ids[:len(tr_df)]
+    n1904_keys = key_ids[len(tr_df):]
+    tr_word_ids = tr_df["word_id"].to_numpy()
+    tr_books = tr_df["book"].to_numpy()
+    tr_chapters = tr_df["chapter"].to_numpy()
+    tr_verse_nums = tr_df["verse"].to_numpy()
+    tr_ranks = tr_df["word_rank"].to_numpy()
+    tr_words = tr_df["word"].to_numpy()
+    n1904_node_ids = n1904_df["node_id"].to_numpy()
+    n1904_ranks = n1904_df["word_rank"].to_numpy()
+    tr_verse_rows = build_verse_row_index(tr_df)
+    n1904_verse_rows = build_verse_row_index(n1904_df)
+
+    alignment_path.parent.mkdir(parents=True, exist_ok=True)
+    gaps_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with pq.ParquetWriter(alignment_path, alignment_schema, compression="zstd") as writer, \
+            open(gaps_path, "w", encoding="utf-8", newline="") as gaps_file:
+        gap_writer = csv.writer(gaps_file, lineterminator="\n")
+        gap_writer.writerow(GAP_COLUMNS)
+
+        for (tr_book, n1904_book), tr_book_df in tqdm(
+            tr_groups, total=tr_groups.ngroups, desc="Aligning books"
+        ):
+            n1904_book_words = int(n1904_book_sizes.get(n1904_book, 0))
+
+            if n1904_book_words == 0:
+                logger.warning(f"No N1904 data for book: {tr_book} -> {n1904_book}")
+                # All TR words in this book are gaps
+                gap_writer.writerows(zip(
+                    tr_book_df["word_id"].to_numpy(), tr_book_df["book"].to_numpy(),
+                    tr_book_df["chapter"].to_numpy(), tr_book_df["verse"].to_numpy(),
+                    tr_book_df["word_rank"].to_numpy(), tr_book_df["word"].to_numpy(),
+                    repeat("no_n1904_book"),
+                ))
+                gap_type_counts["no_n1904_book"] += len(tr_book_df)
+                continue
+
+            # Get verses (packed chapter/verse keys, compared in sorted order)
+            tr_rows = tr_verse_rows[tr_book]
+            n1904_rows = n1904_verse_rows[n1904_book]
+            tr_verses = np.fromiter(tr_rows, dtype=np.int64, count=len(tr_rows))
+            n1904_verses = np.fromiter(n1904_rows, dtype=np.int64, count=len(n1904_rows))
+            common_verses = np.intersect1d(tr_verses, n1904_verses, assume_unique=True)
+
+            book_alignments = 0
+            book_tr_gaps = 0
+
+            # Process common verses
+            for verse_key in common_verses.tolist():
+                tr_idx = tr_rows[verse_key]
+                n1904_idx = n1904_rows[verse_key]
+
+                alignments, tr_gaps, n1904_gaps = align_key_ids(
+                    tuple(tr_keys[tr_idx].tolist()), tuple(n1904_keys[n1904_idx].tolist())
+                )
+
+                # Record alignments
+                for tr_pos, n1904_pos in alignments:
+                    t = tr_idx[tr_pos]
+                    n = n1904_idx[n1904_pos]
+                    alignment_cols["tr_word_id"].append(tr_word_ids[t])
+                    alignment_cols["n1904_node_id"].append(n1904_node_ids[n])
+                    alignment_cols["book"].append(tr_books[t])
+                    alignment_cols["chapter"].append(tr_chapters[t])
+                    alignment_cols["verse"].append(tr_verse_nums[t])
+                    alignment_cols["tr_word_rank"].append(tr_ranks[t])
+                    alignment_cols["n1904_word_rank"].append(n1904_ranks[n])
+                    alignment_cols["tr_word"].append(tr_words[t])
+                    book_alignments += 1
+
+                # Record TR gaps
+                for tr_pos in tr_gaps:
+                    t = tr_idx[tr_pos]
+                    gap_writer.writerow([
+                        tr_word_ids[t], tr_books[t], tr_chapters[t],
+                        tr_verse_nums[t], tr_ranks[t], tr_words[t],
+                        "unmatched",
+                    ])
+                    gap_type_counts["unmatched"] += 1
+                    book_tr_gaps += 1
+
+            # Handle TR-only verses (verses in TR but not in N1904)
+            tr_only_verses = np.setdiff1d(tr_verses, n1904_verses, assume_unique=True)
+            for verse_key in tr_only_verses.tolist():
+                tr_idx = tr_rows[verse_key]
+                gap_writer.writerows(zip(
+                    tr_word_ids[tr_idx], tr_books[tr_idx], tr_chapters[tr_idx],
+                    tr_verse_nums[tr_idx], tr_ranks[tr_idx], tr_words[tr_idx],
+                    repeat("tr_only_verse"),
+                ))
+                gap_type_counts["tr_only_verse"] += len(tr_idx)
+                book_tr_gaps += len(tr_idx)
+
+            # Flush this book's alignments and release the buffers
+            writer.write_batch(
+                pa.RecordBatch.from_pydict(alignment_cols, schema=alignment_schema)
             )
-
-            # Record alignments
-            for tr_idx, n1904_idx in alignments:
-                tr_word = tr_verse[tr_idx]
-                n1904_word = n1904_verse[n1904_idx]
-                alignment_records.append({
-                    "tr_word_id": tr_word["word_id"],
-                    "n1904_node_id": n1904_word.get("node_id"),
-                    "book": tr_word["book"],
-                    "chapter": tr_word["chapter"],
-                    "verse": tr_word["verse"],
-                    "tr_word_rank": tr_word["word_rank"],
-                    "n1904_word_rank": n1904_word.get("word_rank"),
-                    "tr_word": tr_word["word"],
-                })
-                book_alignments += 1
-
-            # Record TR gaps
-            for tr_idx in tr_gaps:
-                tr_word = tr_verse[tr_idx]
-                gap_records.append({
-                    "word_id": tr_word["word_id"],
-                    "book": tr_word["book"],
-                    "chapter": tr_word["chapter"],
-                    "verse": tr_word["verse"],
-                    "word_rank": tr_word["word_rank"],
-                    "word": tr_word["word"],
-                    "gap_type": "unmatched",
-                })
-                book_tr_gaps += 1
-
-        # Handle TR-only verses (verses in TR but not in N1904)
-        tr_only_verses = tr_verses - n1904_verses
-        for chapter, verse in tr_only_verses:
-            tr_verse_df = tr_book_df[
-                (tr_book_df["chapter"] == chapter) & (tr_book_df["verse"] == verse)
-            ]
-            for _, row in tr_verse_df.iterrows():
-                gap_records.append({
-                    "word_id": row["word_id"],
-                    "book": row["book"],
-                    "chapter": row["chapter"],
-                    "verse": row["verse"],
-                    "word_rank": row["word_rank"],
-                    "word": row["word"],
-                    "gap_type": "tr_only_verse",
-                })
-                book_tr_gaps += 1
-
-        # Book statistics
-        book_stats[tr_book] = {
-            "tr_words": len(tr_book_df),
-            "n1904_words": len(n1904_book_df),
-            "alignments": book_alignments,
-            "gaps": book_tr_gaps,
-            "alignment_rate": book_alignments / len(tr_book_df) * 100 if len(tr_book_df) > 0 else 0,
-        }
+            for col in alignment_cols.values():
+                col.clear()
+            total_aligned += book_alignments
+
+            # Book statistics
+            book_stats[tr_book] = {
+                "tr_words": len(tr_book_df),
+                "n1904_words": n1904_book_words,
+                "alignments": book_alignments,
+                "gaps": book_tr_gaps,
+                "alignment_rate": book_alignments / len(tr_book_df) * 100 if len(tr_book_df) > 0 else 0,
+            }
 
     # Overall statistics
     total_tr = len(tr_df)
-    total_aligned = len(alignment_records)
-    total_gaps = len(gap_records)
+    total_gaps = sum(gap_type_counts.values())
 
     stats = {
         "total_tr_words": total_tr,
         "total_aligned": total_aligned,
         "total_gaps": total_gaps,
         "alignment_rate": total_aligned / total_tr * 100 if total_tr > 0 else 0,
+        "gap_types": dict(gap_type_counts.most_common()),
         "book_stats": book_stats,
     }
 
-    return alignment_records, gap_records, stats
+    return stats
 
 
 def main(config: dict = None, dry_run: bool = False) -> bool:
@@ -227,19 +317,11 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
     logger.info(f"TR words: {len(tr_df):,}")
     logger.info(f"N1904 words: {len(n1904_df):,}")
 
-    # Run alignment
-    alignment_records, gap_records, stats = run_full_alignment(tr_df, n1904_df, config)
-
-    # Save results
-    logger.info("Saving results...")
-
-    alignment_df = pd.DataFrame(alignment_records)
-    alignment_df.to_parquet(alignment_path, index=False)
-    logger.info(f"Alignment map: {len(alignment_df):,} records -> {alignment_path}")
+    # Run alignment (results are streamed to disk as each book completes)
+    stats = run_full_alignment(tr_df, n1904_df, config, alignment_path, gaps_path)
 
-    gaps_df = pd.DataFrame(gap_records)
-    gaps_df.to_csv(gaps_path, index=False)
-    logger.info(f"Gaps: {len(gaps_df):,} records -> {gaps_path}")
+    logger.info(f"Alignment map: {stats['total_aligned']:,} records -> {alignment_path}")
+    logger.info(f"Gaps: {stats['total_gaps']:,} records -> {gaps_path}")
 
     # Generate report
     report_lines = [
@@ -272,10 +354,8 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
         "",
     ])
 
-    if len(gaps_df) > 0:
-        gap_types = gaps_df["gap_type"].value_counts()
-        for gap_type, count in gap_types.items():
-            report_lines.append(f"- **{gap_type}**: {count:,}")
+    for gap_type, count in stats["gap_types"].items():
+        report_lines.append(f"- **{gap_type}**: {count:,}")
 
     report_path.parent.mkdir(parents=True, exist_ok=True)
     report_path.write_text("\n".join(report_lines))
@@ -15,14 +15,18 @@ Usage:
 import argparse
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from scripts.utils.config import load_config
 from scripts.utils.logging import ScriptLogger, get_logger
 
+if TYPE_CHECKING:  # pandas stays a lazy import at runtime so --dry-run works without it
+    import pandas as pd
+
 
-def build_id_translation(alignment_df, n1904_df) -> "pd.DataFrame":
+def build_id_translation(alignment_df: "pd.DataFrame", n1904_df: "pd.DataFrame") -> "pd.DataFrame":
     """
     Build ID translation table from N1904 node IDs to TR word IDs.
 
@@ -33,19 +37,17 @@ def build_id_translation(alignment_df, n1904_df) -> "pd.DataFrame":
     Returns:
         DataFrame with ID mappings
     """
+    import numpy as np
     import pandas as pd
 
     logger = get_logger(__name__)
 
     # Start with word-level mappings
-    word_map = alignment_df[["n1904_node_id", "tr_word_id"]].copy()
-    word_map = word_map.rename(columns={
-        "n1904_node_id": "n1904_id",
-        "tr_word_id": "tr_id"
-    })
-    word_map["node_type"] = "word"
+    word_n1904_ids = alignment_df["n1904_node_id"].to_numpy(dtype=np.int64)
+    word_tr_ids = alignment_df["tr_word_id"].to_numpy(dtype=np.int64)
+    n_words = len(word_n1904_ids)
 
-    logger.info(f"Word mappings: {len(word_map):,}")
+    logger.info(f"Word mappings: {n_words:,}")
 
     # Get unique clause and phrase mappings from aligned words
     # For each aligned word, we know its clause_id and phrase_id in N1904
@@ -59,31 +61,45 @@ def build_id_translation(alignment_df, n1904_df) -> "pd.DataFrame":
         how="left"
     )
 
-    # Create clause ID mapping
-    # Each unique N1904 clause_id gets a new TR clause ID
-    unique_clauses = aligned_with_containers["clause_id"].dropna().unique()
-    clause_map = pd.DataFrame({
-        "n1904_id": unique_clauses,
-        "tr_id": range(1000000, 1000000 + len(unique_clauses)),  # Offset to avoid word ID collision
-        "node_type": "clause"
+    # Each unique N1904 clause_id gets a new TR clause ID (first-seen order)
+    _, unique_clauses = pd.factorize(aligned_with_containers["clause_id"], sort=False)
+    n_clauses = len(unique_clauses)
+    logger.info(f"Clause mappings: {n_clauses:,}")
+
+    # Same for phrases
+    _, unique_phrases = pd.factorize(aligned_with_containers["phrase_id"], sort=False)
+    n_phrases = len(unique_phrases)
+    logger.info(f"Phrase mappings: {n_phrases:,}")
+
+    # Fill all mappings into pre-allocated columns: words, clauses, phrases
+    total = n_words + n_clauses + n_phrases
+    clauses = slice(n_words, n_words + n_clauses)
+    phrases = slice(n_words + n_clauses, total)
+
+    n1904_ids = np.empty(total, dtype=np.int64)
+    tr_ids = np.empty(total, dtype=np.int64)
+    node_type_codes = np.empty(total, dtype=np.int8)
+
+    n1904_ids[:n_words] = word_n1904_ids
+    tr_ids[:n_words] = word_tr_ids
+    node_type_codes[:n_words] = 0
+
+    n1904_ids[clauses] = np.asarray(unique_clauses, dtype=np.int64)
+    tr_ids[clauses] = np.arange(n_clauses, dtype=np.int64) + 1000000  # Offset to avoid word ID collision
+    node_type_codes[clauses] = 1
+
+    n1904_ids[phrases] = np.asarray(unique_phrases, dtype=np.int64)
+    tr_ids[phrases] = np.arange(n_phrases, dtype=np.int64) + 2000000  # Different offset
+    node_type_codes[phrases] = 2
+
+    # Build the final dtypes up front (nullable Int64 IDs, categorical type)
+    id_translation = pd.DataFrame({
+        "n1904_id": pd.array(n1904_ids, dtype="Int64"),
+        "tr_id": pd.array(tr_ids, dtype="Int64"),
+        "node_type": pd.Categorical.from_codes(
+            node_type_codes, categories=["word", "clause", "phrase"]
+        ),
     })
-    logger.info(f"Clause mappings: {len(clause_map):,}")
-
-    # Create phrase ID mapping
-    unique_phrases = aligned_with_containers["phrase_id"].dropna().unique()
-    phrase_map = pd.DataFrame({
-        "n1904_id": unique_phrases,
-        "tr_id": range(2000000, 2000000 + len(unique_phrases)),  # Different offset
-        "node_type": "phrase"
-    })
-    logger.info(f"Phrase mappings: {len(phrase_map):,}")
-
-    # Combine all mappings
-    id_translation = pd.concat([word_map, clause_map, phrase_map], ignore_index=True)
-
-    # Ensure IDs are integers
-    id_translation["n1904_id"] = id_translation["n1904_id"].astype("Int64")
-    id_translation["tr_id"] = id_translation["tr_id"].astype("Int64")
 
     return id_translation
 
@@ -116,18 +132,29 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
 
     # Load data
     logger.info("Loading alignment map...")
-    alignment_df = pd.read_parquet(alignment_path)
+    alignment_df = pd.read_parquet(
+        alignment_path, columns=["tr_word_id", "n1904_node_id"], dtype_backend="pyarrow"
+    )
     logger.info(f"Alignments: {len(alignment_df):,}")
 
     logger.info("Loading N1904 data...")
-    n1904_df = pd.read_parquet(n1904_path)
+    n1904_df = pd.read_parquet(
+        n1904_path, columns=["node_id", "clause_id", "phrase_id"], dtype_backend="pyarrow"
+    )
 
     # Build translation table
     logger.info("Building ID translation table...")
     id_translation = build_id_translation(alignment_df, n1904_df)
 
-    # Save
-    id_translation.to_parquet(output_path, index=False)
+    # Save (node_type is categorical -> dictionary-encoded on disk)
+    id_translation.to_parquet(
+        output_path,
+        index=False,
+        row_group_size=16384,
+        compression="zstd",
+        compression_level=3,
+        use_dictionary=True,
+    )
     logger.info(f"Saved {len(id_translation):,} mappings to {output_path}")
 
     # Summary by type
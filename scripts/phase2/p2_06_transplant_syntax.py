@@ -16,14 +16,29 @@ Usage:
 import argparse
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from scripts.utils.config import load_config
 from scripts.utils.logging import ScriptLogger, get_logger
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Features to transplant from N1904
+SYNTAX_FEATURES = ["lemma", "sp", "case", "tense", "voice", "mood",
+                   "function", "role", "parent", "clause_id", "phrase_id", "gloss"]
 
-def transplant_syntax(tr_df, n1904_df, alignment_df, id_translation_df, config: dict):
+
+def transplant_syntax(
+    tr_df: "pd.DataFrame",
+    n1904_df: "pd.DataFrame",
+    alignment_df: "pd.DataFrame",
+    id_translation_df: "pd.DataFrame",
+    config: dict,
+) -> "pd.DataFrame":
     """
     Transplant syntax features from N1904 to TR for aligned words.
 
@@ -38,62 +53,50 @@ def transplant_syntax(tr_df, n1904_df, alignment_df, id_translation_df, config:
         TR DataFrame with transplanted syntax features
     """
     import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
 
     logger = get_logger(__name__)
 
-    # Features to transplant from N1904
-    syntax_features = ["lemma", "sp", "case", "tense", "voice", "mood",
-                       "function", "role", "parent", "clause_id", "phrase_id", "gloss"]
-
-    # Start with TR words
-    result = tr_df.copy()
-
-    # Initialize syntax columns
-    for feat in syntax_features:
-        if feat not in result.columns:
-            result[feat] = None
-
-    # Add alignment status
-    result["aligned"] = False
-    result["n1904_node_id"] = None
-
-    # Create lookup from alignment
-    alignment_lookup = alignment_df.set_index("tr_word_id")["n1904_node_id"].to_dict()
-
-    # Create N1904 feature lookup
-    n1904_lookup = n1904_df.set_index("node_id").to_dict("index")
-
-    # Create ID translation lookup
-    id_trans_lookup = id_translation_df.set_index("n1904_id")["tr_id"].to_dict()
+    syntax_features = SYNTAX_FEATURES
 
     logger.info("Transplanting syntax features...")
-    transplant_count = 0
-
-    for idx, row in result.iterrows():
-        word_id = row["word_id"]
-
-        if word_id in alignment_lookup:
-            n1904_id = alignment_lookup[word_id]
-
-            if n1904_id in n1904_lookup:
-                n1904_word = n1904_lookup[n1904_id]
 
-                # Copy features
-                for feat in syntax_features:
-                    if feat in n1904_word:
-                        value = n1904_word[feat]
-
-                        # Translate parent ID if it's a node reference
-                        if feat == "parent" and value is not None:
-                            value = id_trans_lookup.get(value, value)
-                        elif feat in ["clause_id", "phrase_id"] and value is not None:
-                            value = id_trans_lookup.get(value, value)
-
-                        result.at[idx, feat] = value
-
-                result.at[idx, "aligned"] = True
-                result.at[idx, "n1904_node_id"] = n1904_id
-                transplant_count += 1
+    # Resolve each TR word to its aligned N1904 row with Arrow hash lookups
+    align_pos = pc.index_in(
+        pa.array(tr_df["word_id"]), value_set=pa.array(alignment_df["tr_word_id"])
+    )
+    n1904_node_ids = pc.take(pa.array(alignment_df["n1904_node_id"]), align_pos)
+    n1904_pos = pc.index_in(n1904_node_ids, value_set=pa.array(n1904_df["node_id"]))
+    aligned_mask = n1904_pos.is_valid()
+
+    # Gather the N1904 feature columns for all TR words in one take()
+    gathered = pa.Table.from_pandas(n1904_df[syntax_features], preserve_index=False).take(n1904_pos)
+    gathered = gathered.append_column(
+        "n1904_node_id",
+        pc.if_else(aligned_mask, n1904_node_ids, pa.scalar(None, n1904_node_ids.type)),
+    )
+    n1904_feats = gathered.to_pandas().set_axis(tr_df.index)
+    aligned = pd.Series(aligned_mask.to_numpy(zero_copy_only=False), index=tr_df.index)
+
+    # Declare every feature plus the alignment status in a single assign.
+    # Features the TR data already carried keep their value on unaligned words.
+    result = tr_df.assign(**{
+        feat: (
+            n1904_feats[feat].where(aligned, tr_df[feat])
+            if feat in tr_df.columns
+            else n1904_feats[feat]
+        )
+        for feat in syntax_features
+    }, aligned=aligned, n1904_node_id=n1904_feats["n1904_node_id"])
+
+    # Translate node references (parent, containers) into TR ids
+    # float64 values, so the translated columns stay float64 with NaN
+    id_trans = id_translation_df.set_index("n1904_id")["tr_id"].astype("float64")
+    for feat in ["parent", "clause_id", "phrase_id"]:
+        result[feat] = result[feat].map(id_trans).fillna(result[feat])
+
+    transplant_count = int(aligned.sum())
 
     logger.info(f"Transplanted features for {transplant_count:,} words")
     logger.info(f"Unaligned words: {len(result) - transplant_count:,}")
@@ -118,6 +121,7 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
         logger.info("[DRY RUN] Would transplant syntax features")
         return True
 
+    import numpy as np
     import pandas as pd
 
     # Check inputs
@@ -128,9 +132,10 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
 
     # Load data
     logger.info("Loading data...")
+    # Numpy-backed dtypes: tr_transplanted.parquet feeds phase 4 unchanged
     tr_df = pd.read_parquet(tr_path)
-    n1904_df = pd.read_parquet(n1904_path)
-    alignment_df = pd.read_parquet(alignment_path)
+    n1904_df = pd.read_parquet(n1904_path, columns=["node_id"] + SYNTAX_FEATURES)
+    alignment_df = pd.read_parquet(alignment_path, columns=["tr_word_id", "n1904_node_id"])
     id_translation_df = pd.read_parquet(id_trans_path)
 
     logger.info(f"TR words: {len(tr_df):,}")
@@ -142,15 +147,14 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
     result = transplant_syntax(tr_df, n1904_df, alignment_df, id_translation_df, config)
 
     # Validate - check for broken parent references
-    valid_ids = set(result["word_id"].tolist())
-    # Add container IDs from translation table
-    container_ids = id_translation_df[id_translation_df["node_type"] != "word"]["tr_id"].tolist()
-    valid_ids.update(container_ids)
-
-    broken_refs = 0
-    for parent_id in result["parent"].dropna():
-        if parent_id not in valid_ids and parent_id != 0:
-            broken_refs += 1
+    # Valid targets are TR words plus container IDs from the translation table
+    container_ids = id_translation_df.loc[id_translation_df["node_type"] != "word", "tr_id"]
+    valid_ids = np.concatenate([
+        result["word_id"].to_numpy(dtype="int64"),
+        container_ids.to_numpy(dtype="int64"),
+    ])
+    parent_ids = result["parent"].dropna().to_numpy(dtype="int64")
+    broken_refs = int(np.count_nonzero((parent_ids != 0) & ~np.isin(parent_ids, valid_ids)))
 
     if broken_refs > 0:
         logger.warning(f"Found {broken_refs:,} potentially broken parent references")
@@ -158,7 +162,14 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
         logger.info("No broken parent references detected")
 
     # Save
-    result.to_parquet(output_path, index=False)
+    result.to_parquet(
+        output_path,
+        index=False,
+        row_group_size=16384,
+        compression="zstd",
+        compression_level=3,
+        use_dictionary=True,
+    )
     logger.info(f"Saved to: {output_path}")
 
     # Summary
@@ -4,7 +4,7 @@ Script: p3_01_analyze_gaps.py
 Phase: 3 - Delta Patching
 Purpose: Categorize and group gap spans for NLP processing
 
-Input:  data/intermediate/gaps.csv, data/intermediate/tr_words.parquet
+Input:  data/intermediate/gaps.csv
 Output: data/intermediate/gap_spans.parquet, reports/gap_analysis_report.md
 
 Usage:
@@ -15,15 +15,19 @@ Usage:
 import argparse
 import sys
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import TYPE_CHECKING, List, Dict, Tuple
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from scripts.utils.config import load_config
 from scripts.utils.logging import ScriptLogger, get_logger
 
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
 
-def group_gaps_into_spans(gaps_df, tr_df) -> "pd.DataFrame":
+def group_gaps_into_spans(gaps_df: "pd.DataFrame") -> "pd.DataFrame":
     """
     Group consecutive gap words into contiguous spans.
 
@@ -31,13 +35,15 @@ def group_gaps_into_spans(gaps_df, tr_df) -> "pd.DataFrame":
     Adjacent means word_rank differs by 1.
 
     Args:
-        gaps_df: DataFrame of gap words
-        tr_df: Full TR words DataFrame (for getting word text)
+        gaps_df: DataFrame of gap words (includes the word text)
 
     Returns:
         DataFrame of gap spans with metadata
     """
+    import numpy as np
     import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
 
     logger = get_logger(__name__)
 
@@ -46,77 +52,59 @@ def group_gaps_into_spans(gaps_df, tr_df) -> "pd.DataFrame":
         ["book", "chapter", "verse", "word_rank"]
     ).reset_index(drop=True)
 
-    # Create TR lookup for word text
-    tr_lookup = tr_df.set_index("word_id").to_dict("index")
-
-    spans = []
-    current_span = None
-
-    for _, row in gaps_sorted.iterrows():
-        book = row["book"]
-        chapter = row["chapter"]
-        verse = row["verse"]
-        word_rank = row["word_rank"]
-        word_id = row["word_id"]
-        word = row["word"]
-        gap_type = row["gap_type"]
-
-        # Check if this continues the current span
-        if (current_span is not None and
-            current_span["book"] == book and
-            current_span["chapter"] == chapter and
-            current_span["verse"] == verse and
-            word_rank == current_span["end_word_rank"] + 1):
-            # Extend current span
-            current_span["end_word_rank"] = word_rank
-            current_span["word_ids"].append(word_id)  # Store actual word_id
-            current_span["words"].append(word)
-            current_span["word_count"] += 1
-        else:
-            # Save previous span if exists
-            if current_span is not None:
-                spans.append(current_span)
-
-            # Start new span
-            current_span = {
-                "book": book,
-                "chapter": chapter,
-                "verse": verse,
-                "start_word_rank": word_rank,
-                "end_word_rank": word_rank,
-                "word_ids": [word_id],  # Store actual word_id from gaps.csv
-                "words": [word],
-                "word_count": 1,
-                "gap_type": gap_type,
-            }
-
-    # Don't forget the last span
-    if current_span is not None:
-        spans.append(current_span)
-
-    # Convert to DataFrame and add span IDs
-    span_records = []
-    for i, span in enumerate(spans):
-        span_records.append({
-            "span_id": i + 1,
-            "book": span["book"],
-            "chapter": span["chapter"],
-            "verse": span["verse"],
-            "start_word_rank": span["start_word_rank"],
-            "end_word_rank": span["end_word_rank"],
-            "word_count": span["word_count"],
-            "text": " ".join(span["words"]),
-            "word_ids": span["word_ids"],
-            "gap_type": span["gap_type"],
-            "category": categorize_span(span),
-        })
-
-    return pd.DataFrame(span_records)
-
-
-def categorize_span(span: dict) -> str:
+    # A new span starts whenever the verse changes or word_rank skips
+    loc_cols = ["book", "chapter", "verse"]
+    verse_change = (gaps_sorted[loc_cols] != gaps_sorted[loc_cols].shift()).any(axis=1)
+    rank_break = gaps_sorted["word_rank"].diff().ne(1)
+    span_start = verse_change | rank_break
+
+    # Span boundaries as offsets into the sorted gap rows. Rows are sorted by
+    # word_rank within a verse, so a span's first/last rows hold its min/max rank.
+    offsets = np.append(np.flatnonzero(span_start.to_numpy()), len(gaps_sorted))
+    starts = offsets[:-1]
+    ends = offsets[1:] - 1
+
+    first_rows = gaps_sorted.take(starts)
+    spans_df = pd.DataFrame({
+        "book": first_rows["book"].to_numpy(),
+        "chapter": first_rows["chapter"].to_numpy(),
+        "verse": first_rows["verse"].to_numpy(),
+        "start_word_rank": first_rows["word_rank"].to_numpy(),
+        "end_word_rank": gaps_sorted["word_rank"].to_numpy()[ends],
+        "word_count": np.diff(offsets),
+        "gap_type": first_rows["gap_type"].to_numpy(),
+    })
+
+    # Store actual word_ids from gaps.csv as an Arrow large_list<int64>
+    # built straight from the offsets and the flat id buffer (no Python ints)
+    span_word_ids = pa.LargeListArray.from_arrays(
+        pa.array(offsets, type=pa.int64()),
+        pa.array(gaps_sorted["word_id"].to_numpy(dtype=np.int64)),
+    )
+    spans_df.insert(
+        spans_df.columns.get_loc("word_count") + 1,
+        "word_ids",
+        pd.arrays.ArrowExtensionArray(span_word_ids),
+    )
+
+    # Join each span's words in one Arrow kernel call over a list view
+    words = pa.array(gaps_sorted["word"].to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+    span_words = pa.ListArray.from_arrays(pa.array(offsets, type=pa.int32()), words)
+    spans_df.insert(
+        spans_df.columns.get_loc("word_count") + 1,
+        "text",
+        pc.binary_join(span_words, " ").to_pandas(),
+    )
+
+    spans_df.insert(0, "span_id", range(1, len(spans_df) + 1))
+    spans_df["category"] = categorize_spans(spans_df)
+
+    return spans_df
+
+
+def categorize_spans(spans_df: "pd.DataFrame") -> "np.ndarray":
     """
-    Categorize a gap span by its characteristics.
+    Categorize gap spans by their characteristics.
 
     Categories:
     - single_word: Single word addition/substitution
@@ -125,22 +113,25 @@ def categorize_span(span: dict) -> str:
     - full_verse: Entire verse is a gap (TR-only verse)
 
     Args:
-        span: Span dictionary
+        spans_df: DataFrame of spans with gap_type and word_count
 
     Returns:
-        Category string
+        Array of category strings, one per span
     """
-    if span["gap_type"] == "tr_only_verse":
-        return "full_verse"
-    elif span["word_count"] == 1:
-        return "single_word"
-    elif span["word_count"] <= 5:
-        return "short_phrase"
-    else:
-        return "long_phrase"
+    import numpy as np
 
+    return np.select(
+        [
+            spans_df["gap_type"].eq("tr_only_verse"),
+            spans_df["word_count"].eq(1),
+            spans_df["word_count"].le(5),
+        ],
+        ["full_verse", "single_word", "short_phrase"],
+        default="long_phrase",
+    )
 
-def generate_report(spans_df, gaps_df, output_path: Path) -> None:
+
+def generate_report(spans_df: "pd.DataFrame", gaps_df: "pd.DataFrame", output_path: Path) -> None:
     """Generate gap analysis report."""
     logger = get_logger(__name__)
 
@@ -232,7 +223,6 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
     logger = get_logger(__name__)
 
     gaps_path = Path(config["paths"]["data"]["intermediate"]) / "gaps.csv"
-    tr_path = Path(config["paths"]["data"]["intermediate"]) / "tr_words.parquet"
     output_path = Path(config["paths"]["data"]["intermediate"]) / "gap_spans.parquet"
     report_path = Path(config["paths"]["reports"]) / "gap_analysis_report.md"
 
@@ -243,25 +233,23 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
         return True
 
     import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
 
     # Check inputs
     if not gaps_path.exists():
         logger.error(f"Gaps file not found: {gaps_path}")
         return False
-    if not tr_path.exists():
-        logger.error(f"TR words file not found: {tr_path}")
-        return False
 
     # Load data
     logger.info("Loading data...")
     gaps_df = pd.read_csv(gaps_path)
-    tr_df = pd.read_parquet(tr_path)
 
     logger.info(f"Gap words: {len(gaps_df):,}")
 
     # Group into spans
     logger.info("Grouping gaps into contiguous spans...")
-    spans_df = group_gaps_into_spans(gaps_df, tr_df)
+    spans_df = group_gaps_into_spans(gaps_df)
 
     logger.info(f"Created {len(spans_df):,} spans")
 
@@ -270,9 +258,25 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
     for cat, count in categories.items():
         logger.info(f"  {cat}: {count:,}")
 
-    # Save spans
+    # Save spans (low-cardinality labels as categoricals -> dictionary-encoded on disk).
+    # The pandas schema metadata is dropped because pandas cannot parse the
+    # ArrowDtype name of the large_list word_ids column back on read; without it
+    # dictionary columns still load as categoricals and word_ids as arrays.
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    spans_df.to_parquet(output_path, index=False)
+    spans_table = pa.Table.from_pandas(
+        spans_df.astype(
+            {"book": "category", "gap_type": "category", "category": "category"}
+        ),
+        preserve_index=False,
+    ).replace_schema_metadata(None)
+    pq.write_table(
+        spans_table,
+        output_path,
+        row_group_size=16384,
+        compression="zstd",
+        compression_level=3,
+        use_dictionary=True,
+    )
     logger.info(f"Saved spans to: {output_path}")
 
     # Generate report
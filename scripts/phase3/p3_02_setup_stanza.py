@@ -15,6 +15,7 @@ Usage:
 import argparse
 import sys
 from pathlib import Path
+from typing import List
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
@@ -38,27 +39,62 @@ def download_stanza_model() -> bool:
         return False
 
 
-def test_stanza_pipeline() -> bool:
-    """Test Stanza pipeline on sample Greek text."""
+def create_stanza_pipeline(config: dict):
+    """
+    Create the Stanza pipeline described by the config's nlp section.
+
+    Loading the models dominates the cost of a short parse, so callers
+    should create one pipeline and reuse it for every text.
+
+    Args:
+        config: Pipeline config
+
+    Returns:
+        stanza.Pipeline
+    """
+    import stanza
+
+    nlp_config = config.get("nlp", {})
+    batch_sizes = nlp_config.get("batch_size", {})
+
+    return stanza.Pipeline(
+        nlp_config.get("language", "grc"),
+        processors=",".join(nlp_config.get("processors", ["tokenize", "pos", "lemma", "depparse"])),
+        use_gpu=nlp_config.get("use_gpu", False),
+        tokenize_batch_size=batch_sizes.get("tokenize", 32),
+        depparse_batch_size=batch_sizes.get("depparse", 5000),
+        verbose=False,
+    )
+
+
+def parse_texts(nlp, texts: List[str]) -> list:
+    """
+    Parse many texts in one call so Stanza can minibatch across them.
+
+    Args:
+        nlp: Stanza pipeline from create_stanza_pipeline()
+        texts: Texts to parse
+
+    Returns:
+        List of parsed stanza.Document objects, in input order
+    """
     import stanza
 
+    return nlp([stanza.Document([], text=text) for text in texts])
+
+
+def test_stanza_pipeline(nlp) -> bool:
+    """Test Stanza pipeline on sample Greek text."""
     logger = get_logger(__name__)
 
     logger.info("Testing Stanza pipeline...")
 
     try:
-        # Create pipeline with required processors
-        nlp = stanza.Pipeline(
-            "grc",
-            processors="tokenize,pos,lemma,depparse",
-            verbose=False
-        )
-
         # Test on famous Greek text (John 1:1)
         test_text = "ἐν ἀρχῇ ἦν ὁ λόγος"
         logger.info(f"Test input: {test_text}")
 
-        doc = nlp(test_text)
+        doc = parse_texts(nlp, [test_text])[0]
 
         logger.info("Parse results:")
         logger.info("-" * 60)
@@ -92,19 +128,16 @@ def test_stanza_pipeline() -> bool:
         return False
 
 
-def document_stanza_output(config: dict) -> None:
+def document_stanza_output(config: dict, nlp) -> None:
     """Document Stanza's output format for reference."""
-    import stanza
     import json
 
     logger = get_logger(__name__)
 
     output_path = Path(config["paths"]["data"]["intermediate"]) / "stanza_info.json"
 
-    nlp = stanza.Pipeline("grc", processors="tokenize,pos,lemma,depparse", verbose=False)
-
     # Get sample parse
-    doc = nlp("καὶ ὁ λόγος ἦν πρὸς τὸν θεόν")
+    doc = parse_texts(nlp, ["καὶ ὁ λόγος ἦν πρὸς τὸν θεόν"])[0]
 
     # Extract info
     info = {
@@ -162,12 +195,16 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
     if not download_stanza_model():
         return False
 
+    # Load the models once and share the pipeline
+    logger.info("Initializing Stanza pipeline...")
+    nlp = create_stanza_pipeline(config)
+
     # Test pipeline
-    if not test_stanza_pipeline():
+    if not test_stanza_pipeline(nlp):
         return False
 
     # Document output format
-    document_stanza_output(config)
+    document_stanza_output(config, nlp)
 
     logger.info("\nStanza setup complete!")
     logger.info("Ready for Phase 3 gap parsing")
@@ -16,6 +16,7 @@ import argparse
 import json
 import sys
 from pathlib import Path
+from types import MappingProxyType
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
@@ -25,7 +26,7 @@ from scripts.utils.logging import ScriptLogger, get_logger
 
 # Complete UD to N1904/Lowfat label mapping
 # Based on Universal Dependencies annotation guidelines and N1904/OpenText schema
-UD_TO_N1904_DEPREL = {
+UD_TO_N1904_DEPREL = MappingProxyType({
     # Core arguments
     "nsubj": "Subject",
     "nsubj:pass": "Subject",
@@ -90,7 +91,13 @@ UD_TO_N1904_DEPREL = {
     "punct": "Punctuation",
     "root": "Predicate",
     "dep": "Dependent",
-}
+})
+
+# Common UD deprels that must be mapped
+REQUIRED_DEPRELS = frozenset({
+    "nsubj", "obj", "iobj", "obl", "advmod", "amod",
+    "det", "case", "mark", "cc", "conj", "root",
+})
 
 # UD POS to N1904 part of speech mapping
 UD_TO_N1904_POS = {
@@ -130,8 +137,7 @@ def build_label_map(config: dict) -> dict:
     config_deprel = config.get("label_mapping", {}).get("deprel", {})
 
     # Merge with complete mapping (config takes precedence)
-    deprel_map = UD_TO_N1904_DEPREL.copy()
-    deprel_map.update(config_deprel)
+    deprel_map = {**UD_TO_N1904_DEPREL, **config_deprel}
 
     label_map = {
         "deprel": deprel_map,
@@ -151,16 +157,7 @@ def validate_mapping(label_map: dict) -> bool:
     """Validate label mapping for completeness."""
     logger = get_logger(__name__)
 
-    # Common UD deprels that must be mapped
-    required_deprels = [
-        "nsubj", "obj", "iobj", "obl", "advmod", "amod",
-        "det", "case", "mark", "cc", "conj", "root"
-    ]
-
-    missing = []
-    for deprel in required_deprels:
-        if deprel not in label_map["deprel"]:
-            missing.append(deprel)
+    missing = sorted(REQUIRED_DEPRELS - label_map["deprel"].keys())
 
     if missing:
         logger.warning(f"Missing required deprel mappings: {missing}")
@@ -194,8 +191,15 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
 
     # Save
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(label_map, f, indent=2, ensure_ascii=False)
+    try:
+        import orjson
+    except ImportError:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(label_map, f, indent=2, ensure_ascii=False)
+    else:
+        # Same layout as json.dump(indent=2, ensure_ascii=False), written as UTF-8 bytes
+        with open(output_path, "wb") as f:
+            f.write(orjson.dumps(label_map, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
 
     logger.info(f"Saved label map to: {output_path}")
 
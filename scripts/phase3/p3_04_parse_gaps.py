@@ -15,7 +15,7 @@ Usage:
 import argparse
 import sys
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Tuple
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
@@ -23,98 +23,231 @@ from scripts.utils.config import load_config
 from scripts.utils.logging import ScriptLogger, get_logger
 
 
-def parse_span_with_stanza(nlp, span_text: str, span_id: int) -> List[Dict[str, Any]]:
+# Per-word parse columns collected from Stanza (head_in_span is derived
+# from word_idx, stanza_id and head once all spans are parsed)
+PARSE_COLUMNS = [
+    "span_id", "sentence_idx", "word_idx", "stanza_id", "text", "lemma",
+    "upos", "xpos", "feats", "head", "deprel",
+]
+
+
+def parse_schema() -> "pa.Schema":
+    """Arrow schema of the gap_parses table."""
+    import pyarrow as pa
+
+    return pa.schema([
+        ("span_id", pa.int64()),
+        ("sentence_idx", pa.int64()),
+        ("word_idx", pa.int64()),
+        ("stanza_id", pa.int64()),
+        ("text", pa.string()),
+        ("lemma", pa.string()),
+        ("upos", pa.string()),
+        ("xpos", pa.string()),
+        ("feats", pa.string()),
+        ("head", pa.int64()),
+        ("deprel", pa.string()),
+        ("head_in_span", pa.int64()),
+    ])
+
+
+def new_parse_columns() -> Dict[str, list]:
+    """Empty column lists for accumulating word parses."""
+    return {col: [] for col in PARSE_COLUMNS}
+
+
+def append_doc_columns(columns: Dict[str, list], doc, span_id: int) -> None:
     """
-    Parse a single span using Stanza.
+    Append the words of a parsed Stanza document to the parse columns.
 
     Args:
-        nlp: Stanza pipeline
-        span_text: Greek text to parse
+        columns: Column lists from new_parse_columns()
+        doc: Parsed stanza.Document for one span
         span_id: Span identifier
-
-    Returns:
-        List of word parse records
     """
-    if not span_text or not span_text.strip():
-        return []
-
-    doc = nlp(span_text)
-
-    parse_records = []
     word_idx = 0
 
     for sent_idx, sent in enumerate(doc.sentences):
         for word in sent.words:
-            parse_records.append({
-                "span_id": span_id,
-                "sentence_idx": sent_idx,
-                "word_idx": word_idx,
-                "stanza_id": word.id,
-                "text": word.text,
-                "lemma": word.lemma,
-                "upos": word.upos,
-                "xpos": word.xpos,
-                "feats": word.feats,
-                "head": word.head,
-                "deprel": word.deprel,
-                "head_in_span": word.head + word_idx - word.id if word.head > 0 else -1,
-            })
+            columns["span_id"].append(span_id)
+            columns["sentence_idx"].append(sent_idx)
+            columns["word_idx"].append(word_idx)
+            columns["stanza_id"].append(word.id)
+            columns["text"].append(word.text)
+            columns["lemma"].append(word.lemma)
+            columns["upos"].append(word.upos)
+            columns["xpos"].append(word.xpos)
+            columns["feats"].append(word.feats)
+            columns["head"].append(word.head)
+            columns["deprel"].append(word.deprel)
             word_idx += 1
 
-    return parse_records
 
+def parse_span_batches(
+    nlp,
+    todo: List[Tuple[int, str]],
+    batch_size: int,
+    progress=None,
+) -> Tuple[Dict[str, list], List[int]]:
+    """
+    Parse (span_id, text) pairs in batches of Stanza documents.
 
-def parse_all_spans(spans_df, config: dict) -> "pd.DataFrame":
+    If a batch fails, its spans are retried one at a time so a single bad
+    span is still isolated and reported.
+
+    Args:
+        nlp: Stanza pipeline
+        todo: (span_id, text) pairs with non-blank text
+        batch_size: Spans submitted per pipeline call
+        progress: Optional tqdm bar, advanced per batch
+
+    Returns:
+        Tuple of (parse column lists, ids of spans that failed to parse)
+    """
+    from scripts.phase3.p3_02_setup_stanza import parse_texts
+
+    logger = get_logger(__name__)
+
+    columns = new_parse_columns()
+    failed_spans = []
+
+    for start in range(0, len(todo), batch_size):
+        batch = todo[start:start + batch_size]
+
+        try:
+            docs = parse_texts(nlp, [text for _, text in batch])
+        except Exception as e:
+            logger.warning(f"Batch parse failed ({e}); retrying spans individually")
+            docs = None
+
+        for i, (span_id, text) in enumerate(batch):
+            try:
+                doc = docs[i] if docs is not None else nlp(text)
+                append_doc_columns(columns, doc, span_id)
+            except Exception as e:
+                logger.warning(f"Failed to parse span {span_id}: {e}")
+                failed_spans.append(span_id)
+
+        if progress is not None:
+            progress.update(len(batch))
+
+    return columns, failed_spans
+
+
+# Stanza pipeline owned by a parse worker process (see _init_parse_worker)
+_worker_nlp = None
+
+
+def _init_parse_worker(config: dict) -> None:
+    """Load one Stanza pipeline per worker process."""
+    global _worker_nlp
+    from scripts.phase3.p3_02_setup_stanza import create_stanza_pipeline
+
+    _worker_nlp = create_stanza_pipeline(config)
+
+
+def _parse_shard(shard: List[Tuple[int, str]], batch_size: int) -> Tuple[Dict[str, list], List[int]]:
+    """Parse one contiguous shard of spans with the worker's pipeline."""
+    return parse_span_batches(_worker_nlp, shard, batch_size)
+
+
+def parse_all_spans(spans_df, config: dict) -> "pa.Table":
     """
     Parse all gap spans using Stanza.
 
+    Spans are submitted to the pipeline in batches of
+    config["nlp"]["batch_size"]["spans"] documents so Stanza can minibatch
+    across them. With config["nlp"]["workers"] > 1 the spans are split into
+    contiguous shards parsed by that many worker processes, each holding its
+    own pipeline; results keep span order.
+
     Args:
         spans_df: DataFrame of gap spans
         config: Pipeline config
 
     Returns:
-        DataFrame of parse results
+        Arrow table of parse results with parse_schema()
     """
-    import pandas as pd
-    import stanza
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
     from tqdm import tqdm
 
+    from scripts.phase3.p3_02_setup_stanza import create_stanza_pipeline
+
     logger = get_logger(__name__)
 
-    # Initialize Stanza pipeline
-    logger.info("Initializing Stanza pipeline...")
-    nlp = stanza.Pipeline(
-        "grc",
-        processors="tokenize,pos,lemma,depparse",
-        verbose=False,
-        tokenize_pretokenized=False,  # Let Stanza tokenize
-    )
+    nlp_config = config.get("nlp", {})
+    batch_size = nlp_config.get("batch_size", {}).get("spans", 64)
+    workers = max(1, int(nlp_config.get("workers", 1)))
 
-    all_parses = []
+    columns = new_parse_columns()
     failed_spans = []
 
-    logger.info(f"Parsing {len(spans_df)} spans...")
-
-    for _, span in tqdm(spans_df.iterrows(), total=len(spans_df), desc="Parsing spans"):
-        span_id = span["span_id"]
-        span_text = span["text"]
-
-        try:
-            parses = parse_span_with_stanza(nlp, span_text, span_id)
-            all_parses.extend(parses)
-        except Exception as e:
-            logger.warning(f"Failed to parse span {span_id}: {e}")
-            failed_spans.append(span_id)
+    # Blank spans produce no parse records
+    span_ids = spans_df["span_id"].tolist()
+    span_texts = spans_df["text"].tolist()
+    todo = [
+        (span_id, text)
+        for span_id, text in zip(span_ids, span_texts)
+        if isinstance(text, str) and text.strip()
+    ]
+
+    if workers > 1 and len(todo) > batch_size:
+        shard_size = -(-len(todo) // workers)
+        shards = [todo[i:i + shard_size] for i in range(0, len(todo), shard_size)]
+
+        logger.info(
+            f"Parsing {len(spans_df)} spans across {len(shards)} worker processes "
+            f"in batches of {batch_size}..."
+        )
+
+        # spawn: each worker loads its own models (safe with CUDA, unlike fork)
+        with ProcessPoolExecutor(
+            max_workers=len(shards),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_parse_worker,
+            initargs=(config,),
+        ) as pool:
+            results = pool.map(_parse_shard, shards, [batch_size] * len(shards))
+            for shard_columns, failed in tqdm(results, total=len(shards), desc="Parsing shards"):
+                for col in PARSE_COLUMNS:
+                    columns[col].extend(shard_columns[col])
+                failed_spans.extend(failed)
+    else:
+        # Initialize Stanza pipeline
+        logger.info("Initializing Stanza pipeline...")
+        nlp = create_stanza_pipeline(config)
+
+        logger.info(f"Parsing {len(spans_df)} spans in batches of {batch_size}...")
+
+        with tqdm(total=len(todo), desc="Parsing spans") as progress:
+            columns, failed_spans = parse_span_batches(nlp, todo, batch_size, progress)
 
     if failed_spans:
         logger.warning(f"Failed spans: {len(failed_spans)}")
 
-    # Create DataFrame
-    parses_df = pd.DataFrame(all_parses)
+    # Build the table straight from the columns; the head offset within the
+    # span is computed for all words at once
+    schema = parse_schema()
+    head = pa.array(columns["head"], type=pa.int64())
+    head_in_span = pc.if_else(
+        pc.greater(head, 0),
+        pc.subtract(
+            pc.add(head, pa.array(columns["word_idx"], type=pa.int64())),
+            pa.array(columns["stanza_id"], type=pa.int64()),
+        ),
+        pa.scalar(-1, pa.int64()),
+    )
+    columns["head"] = head
+    columns["head_in_span"] = head_in_span
+    parses = pa.table(columns, schema=schema)
 
-    logger.info(f"Parsed {len(parses_df)} words from {len(spans_df)} spans")
+    logger.info(f"Parsed {parses.num_rows} words from {len(spans_df)} spans")
 
-    return parses_df
+    return parses
 
 
 def main(config: dict = None, dry_run: bool = False) -> bool:
@@ -134,6 +267,8 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
         return True
 
     import pandas as pd
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
 
     # Check dependencies
     try:
@@ -154,24 +289,25 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
     logger.info(f"Loaded {len(spans_df)} spans")
 
     # Parse
-    parses_df = parse_all_spans(spans_df, config)
+    parses = parse_all_spans(spans_df, config)
 
     # Save
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    parses_df.to_parquet(output_path, index=False)
+    pq.write_table(parses, output_path, compression="zstd")
     logger.info(f"Saved parses to: {output_path}")
 
     # Summary
     logger.info("\nParsing Summary:")
     logger.info("-" * 40)
     logger.info(f"Total spans: {len(spans_df)}")
-    logger.info(f"Total parsed words: {len(parses_df)}")
+    logger.info(f"Total parsed words: {parses.num_rows}")
 
-    if len(parses_df) > 0:
+    if parses.num_rows > 0:
         logger.info(f"\nDependency relation distribution:")
-        deprel_counts = parses_df["deprel"].value_counts().head(10)
-        for deprel, count in deprel_counts.items():
-            logger.info(f"  {deprel}: {count}")
+        deprel_counts = pc.value_counts(parses["deprel"]).to_pylist()
+        deprel_counts.sort(key=lambda vc: vc["counts"], reverse=True)
+        for vc in deprel_counts[:10]:
+            logger.info(f"  {vc['values']}: {vc['counts']}")
 
     return True
 
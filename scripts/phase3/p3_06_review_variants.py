@@ -48,6 +48,18 @@ def find_variant_spans(spans_df, priority_verses: List[Dict], book_map: Dict) ->
     # Create reverse mapping (N1904 name -> TR code)
     reverse_map = {v: k for k, v in BOOK_NAME_MAP.items()}
 
+    # Normalized N1904 names (map order) for the fuzzy fallback, built once
+    normalized_names = [
+        (n1904_name.lower().replace("_", ""), tr_code)
+        for tr_code, n1904_name in BOOK_NAME_MAP.items()
+    ]
+
+    # Bucket spans by verse once so each priority verse is a dict lookup
+    spans_by_verse = {
+        key: group
+        for key, group in spans_df.groupby(["book", "chapter", "verse"], sort=False, observed=True)
+    }
+
     matched_spans = []
 
     for variant in priority_verses:
@@ -60,18 +72,16 @@ def find_variant_spans(spans_df, priority_verses: List[Dict], book_map: Dict) ->
         tr_book = reverse_map.get(book, book)
         # Try common variations
         if tr_book == book:
-            for tr_code, n1904_name in BOOK_NAME_MAP.items():
-                if book.lower().replace("_", "") in n1904_name.lower().replace("_", ""):
-                    tr_book = tr_code
-                    break
+            book_key = book.lower().replace("_", "")
+            tr_book = next(
+                (tr_code for name, tr_code in normalized_names if book_key in name), book
+            )
 
         # Find matching spans
         for verse in verses:
-            matching = spans_df[
-                (spans_df["book"] == tr_book) &
-                (spans_df["chapter"] == chapter) &
-                (spans_df["verse"] == verse)
-            ]
+            matching = spans_by_verse.get((tr_book, chapter, verse))
+            if matching is None:
+                continue
 
             for _, span in matching.iterrows():
                 matched_spans.append({
@@ -88,22 +98,122 @@ def find_variant_spans(spans_df, priority_verses: List[Dict], book_map: Dict) ->
     return matched_spans
 
 
+def build_variant_review(name: str, spans: List[Dict], syntax_df, syntax_index, span_word_ids: Dict) -> bytes:
+    """
+    Render the review document for one variant.
+
+    Args:
+        name: Variant name
+        spans: Variant span metadata for this variant
+        syntax_df: Gap syntax DataFrame
+        syntax_index: pd.Index over syntax_df["word_id"]
+        span_word_ids: span_id -> word_ids array from the gap spans
+
+    Returns:
+        UTF-8 encoded markdown document
+    """
+    lines = [
+        f"# Variant Review: {name}",
+        "",
+        "## Overview",
+        "",
+        f"This document reviews the NLP-generated syntax for the {name} variant.",
+        "",
+        "## Verses",
+        "",
+    ]
+
+    for span in spans:
+        lines.extend([
+            f"### {span['book']} {span['chapter']}:{span['verse']}",
+            "",
+            f"**Greek Text:** {span['text']}",
+            "",
+            f"**Word Count:** {span['word_count']}",
+            "",
+            f"**Category:** {span['category']}",
+            "",
+        ])
+
+        # Get syntax for this span's words. gap_spans stores word_ids as a
+        # list<int64> column, so each value is an int64 array (None if empty)
+        word_ids = span_word_ids.get(span["span_id"])
+        if word_ids is not None and len(word_ids) > 0:
+            positions = syntax_index.get_indexer(word_ids)
+            span_syntax = syntax_df.iloc[positions[positions >= 0]]
+
+            if len(span_syntax) > 0:
+                lines.extend([
+                    "**Generated Syntax:**",
+                    "",
+                    "| Word ID | Lemma | POS | Function | Parent |",
+                    "|---------|-------|-----|----------|--------|",
+                ])
+
+                table_rows = span_syntax[["word_id", "lemma", "sp", "function", "parent"]]
+                for word_id, lemma, sp, func, parent in table_rows.itertuples(index=False, name=None):
+                    lines.append(
+                        f"| {word_id} | {lemma or '?'} | {sp or '?'} | {func or '?'} | {parent or '-'} |"
+                    )
+
+                lines.append("")
+
+        lines.extend([
+            "#### Review Checklist",
+            "",
+            "- [ ] Subject-predicate agreement is correct",
+            "- [ ] Case function assignments are appropriate",
+            "- [ ] Clause boundaries are correct",
+            "- [ ] No grammatical anomalies",
+            "",
+            "#### Notes",
+            "",
+            "_Add review notes here_",
+            "",
+            "---",
+            "",
+        ])
+
+    lines.extend([
+        "## Summary",
+        "",
+        f"**Total spans reviewed:** {len(spans)}",
+        "",
+        "**Reviewer:** _Not yet reviewed_",
+        "",
+        "**Status:** Pending Review",
+        "",
+    ])
+
+    # One UTF-8 encode of the joined document (Greek text must not depend
+    # on the locale's default encoding)
+    return "\n".join(lines).encode("utf-8")
+
+
 def generate_variant_review(variant_spans: List[Dict], syntax_df, spans_df, output_dir: Path) -> None:
     """
     Generate review documentation for each variant.
 
+    Documents are rendered in order and the files written concurrently on a
+    small thread pool.
+
     Args:
         variant_spans: List of variant span metadata
         syntax_df: Gap syntax DataFrame
         spans_df: Gap spans DataFrame
         output_dir: Directory for review files
     """
-    import ast
+    from concurrent.futures import ThreadPoolExecutor
+
+    import pandas as pd
 
     logger = get_logger(__name__)
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    # Hash index over syntax word_ids: each span resolves its rows in O(k)
+    syntax_index = pd.Index(syntax_df["word_id"])
+
     # Group spans by variant name
     variants = {}
     for span in variant_spans:
@@ -112,99 +222,26 @@ def generate_variant_review(variant_spans: List[Dict], syntax_df, spans_df, outp
             variants[name] = []
         variants[name].append(span)
 
+    # word_ids for just the spans under review
+    wanted = {span["span_id"] for span in variant_spans}
+    reviewed = spans_df[spans_df["span_id"].isin(wanted)]
+    span_word_ids = dict(zip(reviewed["span_id"], reviewed["word_ids"]))
+
+    reviews = []
     for name, spans in variants.items():
         # Create filename from variant name (sanitize for filesystem)
         filename = name.lower().replace(" ", "_").replace("'", "").replace("/", "_") + ".md"
-        filepath = output_dir / filename
+        content = build_variant_review(name, spans, syntax_df, syntax_index, span_word_ids)
+        reviews.append((output_dir / filename, content))
 
-        lines = [
-            f"# Variant Review: {name}",
-            "",
-            "## Overview",
-            "",
-            f"This document reviews the NLP-generated syntax for the {name} variant.",
-            "",
-            "## Verses",
-            "",
-        ]
-
-        for span in spans:
-            lines.extend([
-                f"### {span['book']} {span['chapter']}:{span['verse']}",
-                "",
-                f"**Greek Text:** {span['text']}",
-                "",
-                f"**Word Count:** {span['word_count']}",
-                "",
-                f"**Category:** {span['category']}",
-                "",
-            ])
-
-            # Get syntax for this span's words
-            span_id = span["span_id"]
-            span_data = spans_df[spans_df["span_id"] == span_id]
-
-            if len(span_data) > 0:
-                word_ids = span_data.iloc[0]["word_ids"]
-                if isinstance(word_ids, str):
-                    try:
-                        word_ids = ast.literal_eval(word_ids)
-                    except:
-                        word_ids = []
-
-                # Convert numpy array to list if needed
-                import numpy as np
-                if isinstance(word_ids, np.ndarray):
-                    word_ids = word_ids.tolist()
-                if word_ids and len(word_ids) > 0:
-                    span_syntax = syntax_df[syntax_df["word_id"].isin(word_ids)]
-
-                    if len(span_syntax) > 0:
-                        lines.extend([
-                            "**Generated Syntax:**",
-                            "",
-                            "| Word ID | Lemma | POS | Function | Parent |",
-                            "|---------|-------|-----|----------|--------|",
-                        ])
-
-                        for _, row in span_syntax.iterrows():
-                            lemma = row.get("lemma", "?") or "?"
-                            sp = row.get("sp", "?") or "?"
-                            func = row.get("function", "?") or "?"
-                            parent = row.get("parent", "-") or "-"
-                            lines.append(f"| {row['word_id']} | {lemma} | {sp} | {func} | {parent} |")
-
-                        lines.append("")
-
-            lines.extend([
-                "#### Review Checklist",
-                "",
-                "- [ ] Subject-predicate agreement is correct",
-                "- [ ] Case function assignments are appropriate",
-                "- [ ] Clause boundaries are correct",
-                "- [ ] No grammatical anomalies",
-                "",
-                "#### Notes",
-                "",
-                "_Add review notes here_",
-                "",
-                "---",
-                "",
-            ])
-
-        lines.extend([
-            "## Summary",
-            "",
-            f"**Total spans reviewed:** {len(spans)}",
-            "",
-            "**Reviewer:** _Not yet reviewed_",
-            "",
-            "**Status:** Pending Review",
-            "",
-        ])
+    def write_review(review):
+        filepath, content = review
+        filepath.write_bytes(content)
+        return filepath
 
-        filepath.write_text("\n".join(lines))
-        logger.info(f"Generated review: {filepath}")
+    with ThreadPoolExecutor(max_workers=min(8, len(reviews) or 1)) as pool:
+        for filepath in pool.map(write_review, reviews):
+            logger.info(f"Generated review: {filepath}")
 
 
 def main(config: dict = None, dry_run: bool = False) -> bool:
@@ -18,9 +18,23 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from scripts.utils.cache import read_parquet_cached
 from scripts.utils.config import load_config
 from scripts.utils.logging import ScriptLogger, get_logger
 
+# Syntax fields and morphology that NLP output overrides for gap words
+NLP_SYNTAX_COLUMNS = [
+    "lemma", "sp", "function", "parent",
+    "case", "gn", "nu", "ps", "tense", "voice", "mood",
+]
+
+# Non-standard book codes folded into the 27 NT books
+BOOK_NORMALIZATION = {"ACT24": "ACT", "PA": "JOH"}
+
+# Low-cardinality labels stored as categoricals (dictionary-encoded on disk).
+# sp is left as a plain string: p4_01c writes corrected POS values into it.
+CATEGORICAL_COLUMNS = ["book", "function", "source"]
+
 
 def normalize_books(df):
     """
@@ -32,15 +46,14 @@ def normalize_books(df):
     """
     logger = get_logger(__name__)
 
-    # Track changes
-    act24_count = (df["book"] == "ACT24").sum()
-    pa_count = (df["book"] == "PA").sum()
-
-    # Normalize ACT24 → ACT
-    df.loc[df["book"] == "ACT24", "book"] = "ACT"
+    # Track changes (one counting pass over the column)
+    book_counts = df["book"].value_counts()
+    act24_count = book_counts.get("ACT24", 0)
+    pa_count = book_counts.get("PA", 0)
 
-    # Normalize PA → JOH (Pericope Adulterae is John 7:53-8:11)
-    df.loc[df["book"] == "PA", "book"] = "JOH"
+    # Normalize ACT24 → ACT and PA → JOH (Pericope Adulterae is John 7:53-8:11)
+    if act24_count > 0 or pa_count > 0:
+        df["book"] = df["book"].replace(BOOK_NORMALIZATION)
 
     if act24_count > 0:
         logger.info(f"Normalized ACT24 → ACT: {act24_count} words")
@@ -54,6 +67,9 @@ def merge_syntax_data(transplanted_df, gap_syntax_df, tr_words_df):
     """
     Merge transplanted syntax with NLP-generated gap syntax.
 
+    No defensive copy of transplanted_df is taken: only the updated columns
+    are copied, and assign() returns a new frame that leaves the input as is.
+
     Args:
         transplanted_df: TR words with transplanted N1904 syntax
         gap_syntax_df: NLP-generated syntax for gap words
@@ -62,45 +78,43 @@ def merge_syntax_data(transplanted_df, gap_syntax_df, tr_words_df):
     Returns:
         Complete DataFrame with all words having syntax
     """
+    import numpy as np
     import pandas as pd
 
     logger = get_logger(__name__)
 
     # Start with transplanted data
-    complete_df = transplanted_df.copy()
-
-    # Identify gap words (those without syntax)
-    gap_word_ids = set(gap_syntax_df["word_id"].tolist())
+    complete_df = transplanted_df
 
     logger.info(f"Transplanted words: {len(complete_df)}")
     logger.info(f"Gap syntax words: {len(gap_syntax_df)}")
 
-    # Update gap words with NLP syntax
-    gap_syntax_lookup = gap_syntax_df.set_index("word_id").to_dict("index")
-
-    updated_count = 0
-    for idx, row in complete_df.iterrows():
-        word_id = row["word_id"]
-        if word_id in gap_syntax_lookup:
-            gap_data = gap_syntax_lookup[word_id]
-
-            # Update syntax fields from NLP
-            for col in ["lemma", "sp", "function", "parent"]:
-                if col in gap_data and gap_data[col] is not None:
-                    complete_df.at[idx, col] = gap_data[col]
-
-            # Update morphology if available
-            for col in ["case", "gn", "nu", "ps", "tense", "voice", "mood"]:
-                if col in gap_data and gap_data[col] is not None:
-                    complete_df.at[idx, col] = gap_data[col]
-
-            # Mark as NLP-generated (not transplanted)
-            complete_df.at[idx, "aligned"] = False
-            complete_df.at[idx, "source"] = "nlp"
-            updated_count += 1
-
-    # Mark transplanted words
-    complete_df.loc[complete_df["aligned"] == True, "source"] = "n1904"
+    # Match gap rows to their NLP rows by position (word_id is unique in both)
+    nlp_pos = pd.Index(gap_syntax_df["word_id"]).get_indexer(complete_df["word_id"])
+    is_gap = nlp_pos >= 0
+    gap_rows = np.flatnonzero(is_gap)
+    nlp_rows = nlp_pos[gap_rows]
+
+    # Gap words take the NLP syntax fields and morphology: copy each column's
+    # array once and overwrite only the gap positions
+    updates = {}
+    for col in NLP_SYNTAX_COLUMNS:
+        if col not in gap_syntax_df.columns:
+            continue
+        if col in complete_df.columns:
+            values = complete_df[col].array.copy()
+        else:
+            values = np.full(len(complete_df), np.nan, dtype=object)
+        values[gap_rows] = gap_syntax_df[col].to_numpy()[nlp_rows]
+        updates[col] = values
+    complete_df = complete_df.assign(**updates)
+
+    # Mark gap words as NLP-generated (not transplanted), aligned words as n1904
+    complete_df["aligned"] = complete_df["aligned"].mask(is_gap, False)
+    complete_df["source"] = np.where(
+        is_gap, "nlp", np.where(complete_df["aligned"] == True, "n1904", None)
+    )
+    updated_count = int(is_gap.sum())
 
     logger.info(f"Updated {updated_count} gap words with NLP syntax")
 
@@ -114,6 +128,8 @@ def merge_syntax_data(transplanted_df, gap_syntax_df, tr_words_df):
 
 def validate_merge(complete_df, tr_words_df):
     """Validate that merge is complete and correct."""
+    import numpy as np
+
     logger = get_logger(__name__)
 
     # Check word count matches
@@ -121,21 +137,21 @@ def validate_merge(complete_df, tr_words_df):
         logger.error(f"Word count mismatch: {len(complete_df)} vs {len(tr_words_df)}")
         return False
 
-    # Check all word IDs present
-    complete_ids = set(complete_df["word_id"])
-    original_ids = set(tr_words_df["word_id"])
+    # Check all word IDs present (sorted unique arrays, no Python sets)
+    complete_ids = np.unique(complete_df["word_id"].to_numpy())
+    original_ids = np.unique(tr_words_df["word_id"].to_numpy())
 
-    if complete_ids != original_ids:
-        missing = original_ids - complete_ids
-        extra = complete_ids - original_ids
-        if missing:
+    missing = np.setdiff1d(original_ids, complete_ids, assume_unique=True)
+    extra = np.setdiff1d(complete_ids, original_ids, assume_unique=True)
+    if len(missing) or len(extra):
+        if len(missing):
             logger.error(f"Missing {len(missing)} word IDs")
-        if extra:
+        if len(extra):
             logger.error(f"Extra {len(extra)} word IDs")
         return False
 
     # Check no duplicate word IDs
-    if len(complete_df) != len(complete_df["word_id"].unique()):
+    if len(complete_df) != len(complete_ids):
         logger.error("Duplicate word IDs found")
         return False
 
@@ -143,7 +159,7 @@ def validate_merge(complete_df, tr_words_df):
     return True
 
 
-def main(config: dict = None, dry_run: bool = False) -> bool:
+def main(config: dict = None, dry_run: bool = False, use_cache: bool = True) -> bool:
     """Main entry point."""
     if config is None:
         config = load_config()
@@ -154,13 +170,12 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
     gap_syntax_path = Path(config["paths"]["data"]["intermediate"]) / "gap_syntax.parquet"
     tr_words_path = Path(config["paths"]["data"]["intermediate"]) / "tr_words.parquet"
     output_path = Path(config["paths"]["data"]["intermediate"]) / "tr_complete.parquet"
+    cache_dir = Path(config["paths"]["cache"])
 
     if dry_run:
         logger.info("[DRY RUN] Would merge transplanted and gap syntax data")
         return True
 
-    import pandas as pd
-
     # Check inputs
     for path in [transplanted_path, gap_syntax_path, tr_words_path]:
         if not path.exists():
@@ -169,9 +184,9 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
 
     # Load data
     logger.info("Loading data...")
-    transplanted_df = pd.read_parquet(transplanted_path)
-    gap_syntax_df = pd.read_parquet(gap_syntax_path)
-    tr_words_df = pd.read_parquet(tr_words_path)
+    transplanted_df = read_parquet_cached(transplanted_path, cache_dir, use_cache)
+    gap_syntax_df = read_parquet_cached(gap_syntax_path, cache_dir, use_cache)
+    tr_words_df = read_parquet_cached(tr_words_path, cache_dir, use_cache)
 
     logger.info(f"Transplanted: {len(transplanted_df)} words")
     logger.info(f"Gap syntax: {len(gap_syntax_df)} words")
@@ -185,16 +200,21 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
     logger.info("Normalizing book names...")
     complete_df = normalize_books(complete_df)
 
-    # Also normalize tr_words_df for validation comparison
-    tr_words_df = normalize_books(tr_words_df.copy())
-
-    # Validate
+    # Validate (word counts and word_id sets only, so tr_words_df needs no
+    # book normalization of its own)
     if not validate_merge(complete_df, tr_words_df):
         return False
 
     # Save
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    complete_df.to_parquet(output_path, index=False)
+    complete_df.astype({col: "category" for col in CATEGORICAL_COLUMNS}).to_parquet(
+        output_path,
+        index=False,
+        row_group_size=65536,
+        compression="zstd",
+        compression_level=3,
+        use_dictionary=True,
+    )
     logger.info(f"Saved to: {output_path}")
 
     # Summary
@@ -219,9 +239,13 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--dry-run", action="store_true")
     parser.add_argument("--verbose", "-v", action="store_true")
+    parser.add_argument(
+        "--fresh", action="store_true",
+        help="Ignore the cached copies of the parquet inputs and re-read them"
+    )
     args = parser.parse_args()
 
     with ScriptLogger("p4_01_merge_data") as logger:
         config = load_config()
-        success = main(config, dry_run=args.dry_run)
+        success = main(config, dry_run=args.dry_run, use_cache=not args.fresh)
         sys.exit(0 if success else 1)
@@ -20,6 +20,7 @@ import re
 import sqlite3
 import sys
 import unicodedata
+from functools import lru_cache
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
@@ -115,31 +116,59 @@ CORRECTIONS = [
     },
 ]
 
+# All word_pattern corrections as one alternation, so the word column is
+# scanned once to find the candidate rows
+WORD_PATTERN_RE = re.compile(
+    "|".join(f"(?:{c['pattern']})" for c in CORRECTIONS if c["match_type"] == "word_pattern")
+)
 
+
+# Punctuation and elision marks ignored when matching
+PUNCT_RE = re.compile(r"[᾽᾿'ʼ᾿·.,;:!?\"'()]")
+
+# Combining Diacritical Marks block (U+0300-U+036F): the accents, breathings,
+# diaeresis and iota subscript left by NFD decomposition of Greek letters
+STRIP_MARKS = dict.fromkeys(range(0x300, 0x370))
+
+
+@lru_cache(maxsize=65536)
 def normalize_greek(text):
     """Normalize Greek text for matching."""
     if not text:
         return ""
-    text = unicodedata.normalize("NFC", text)
-    text = unicodedata.normalize("NFD", text)
-    text = "".join(c for c in text if unicodedata.category(c) != "Mn")
+    if not text.isascii():
+        # ASCII has no combining marks, so only non-ASCII text is decomposed
+        text = unicodedata.normalize("NFD", text).translate(STRIP_MARKS)
     text = text.lower()
-    text = re.sub(r"[᾽᾿'ʼ᾿·.,;:!?\"'()]", "", text)
+    text = PUNCT_RE.sub("", text)
     return text
 
 
 def load_n1904_gloss_map(n1904_df):
     """Build lemma -> gloss mapping from N1904."""
     gloss_map = {}
-    for _, row in n1904_df.iterrows():
-        lemma = row.get("lemma", "")
-        gloss = row.get("gloss", "")
-        if lemma and gloss and pd.notna(gloss) and lemma not in gloss_map:
-            gloss_map[lemma] = gloss
-            # Also add normalized version
-            norm = normalize_greek(lemma)
-            if norm not in gloss_map:
-                gloss_map[norm] = gloss
+    if "lemma" not in n1904_df or "gloss" not in n1904_df:
+        return gloss_map
+
+    # First gloss for each lemma that has one
+    lemmas = n1904_df["lemma"]
+    glosses = n1904_df["gloss"]
+    valid = lemmas.notna() & (lemmas != "") & glosses.notna() & (glosses != "")
+    first = pd.DataFrame({"lemma": lemmas[valid], "gloss": glosses[valid]}).drop_duplicates("lemma")
+
+    # Each lemma is followed by its normalized form; the first occurrence of
+    # a key wins. normalize_greek is idempotent, so a lemma that already
+    # appeared as an earlier normalized key also has its own normalized form
+    # taken, matching insert-if-absent over the rows in order
+    first_lemmas = first["lemma"].tolist()
+    keys = [None] * (2 * len(first_lemmas))
+    keys[0::2] = first_lemmas
+    keys[1::2] = [normalize_greek(lemma) for lemma in first_lemmas]
+    values = [gloss for gloss in first["gloss"].tolist() for _ in range(2)]
+
+    entries = pd.Series(values, index=keys, dtype=object)
+    entries = entries[~entries.index.duplicated(keep="first")]
+    gloss_map.update(zip(entries.index, entries.to_numpy()))
     return gloss_map
 
 
@@ -151,92 +180,107 @@ def load_lexicon_map(config):
         return {}
 
     conn = sqlite3.connect(lexicon_path)
-    cursor = conn.execute("SELECT word, definition FROM lexicon")
-
-    lexicon_map = {}
-    for word, definition in cursor:
-        if word and definition:
-            # Clean up definition
-            gloss = definition.split(";")[0].strip()
-            gloss = re.sub(r"^[-—]", "", gloss).strip()
-            if len(gloss) > 50:
-                gloss = gloss[:47] + "..."
-            lexicon_map[word] = gloss
-            lexicon_map[normalize_greek(word)] = gloss
-
+    lex_df = pd.read_sql("SELECT word, definition FROM lexicon", conn)
     conn.close()
-    return lexicon_map
 
+    keep = (
+        lex_df["word"].notna() & (lex_df["word"] != "")
+        & lex_df["definition"].notna() & (lex_df["definition"] != "")
+    )
+    lex_df = lex_df[keep]
 
-def fill_glosses(tr_df, n1904_gloss_map, lexicon_map):
-    """Fill glosses using multiple strategies."""
-    filled_count = 0
-
-    for idx in tr_df.index:
-        if pd.notna(tr_df.at[idx, "gloss"]) and tr_df.at[idx, "gloss"] != "":
-            continue
+    # Clean up definitions
+    gloss = lex_df["definition"].str.split(";", n=1).str[0].str.strip()
+    gloss = gloss.str.replace(r"^[-—]", "", regex=True).str.strip()
+    gloss = gloss.mask(gloss.str.len() > 50, gloss.str[:47] + "...")
 
-        lemma = tr_df.at[idx, "lemma"]
-        word = tr_df.at[idx, "word"]
-        gloss = None
+    # Each entry maps its word, then its normalized word, in table order so
+    # later entries win exactly as with row-by-row insertion
+    words = lex_df["word"].tolist()
+    keys = [None] * (2 * len(words))
+    keys[0::2] = words
+    keys[1::2] = [normalize_greek(word) for word in words]
+    values = [g for g in gloss.tolist() for _ in range(2)]
 
-        # Strategy 1: Manual glosses
-        if lemma in MANUAL_GLOSSES:
-            gloss = MANUAL_GLOSSES[lemma]
-        elif word in MANUAL_GLOSSES:
-            gloss = MANUAL_GLOSSES[word]
+    return dict(zip(keys, values))
 
-        # Strategy 2: N1904 lemma lookup
-        if not gloss and lemma in n1904_gloss_map:
-            gloss = n1904_gloss_map[lemma]
 
-        # Strategy 3: N1904 normalized lookup
-        if not gloss:
-            norm_lemma = normalize_greek(lemma)
-            if norm_lemma in n1904_gloss_map:
-                gloss = n1904_gloss_map[norm_lemma]
+def fill_glosses(tr_df, n1904_gloss_map, lexicon_map):
+    """Fill glosses using multiple strategies."""
+    missing = tr_df["gloss"].isna() | (tr_df["gloss"] == "")
+    lemma = tr_df.loc[missing, "lemma"]
+    word = tr_df.loc[missing, "word"]
+    norm_lemma = lemma.map(normalize_greek, na_action="ignore")
+
+    # One candidate column per strategy, in priority order; empty glosses
+    # fall through to the next strategy
+    candidates = [
+        lemma.map(MANUAL_GLOSSES),          # Strategy 1: Manual glosses
+        word.map(MANUAL_GLOSSES),
+        lemma.map(n1904_gloss_map),         # Strategy 2: N1904 lemma lookup
+        norm_lemma.map(n1904_gloss_map),    # Strategy 3: N1904 normalized lookup
+        lemma.map(lexicon_map),             # Strategy 4: Lexicon lookup
+        norm_lemma.map(lexicon_map),        # Strategy 5: Lexicon normalized lookup
+        word.map(n1904_gloss_map),          # Strategy 6: Word-based lookup in N1904
+    ]
+    gloss = pd.Series(None, index=lemma.index, dtype=object)
+    for candidate in candidates:
+        gloss = gloss.combine_first(candidate.replace("", None))
+
+    # Strategy 7: Proper name fallback
+    is_name = word.str[0].str.isupper().fillna(False).astype(bool)
+    gloss = gloss.mask(gloss.isna() & is_name, "(name)")
+
+    # Strategy 8: Rare word fallback
+    gloss = gloss.fillna("(rare)")
+
+    tr_df.loc[missing, "gloss"] = gloss
+    filled_count = int(missing.sum())
 
-        # Strategy 4: Lexicon lookup
-        if not gloss and lemma in lexicon_map:
-            gloss = lexicon_map[lemma]
+    return tr_df, filled_count
 
-        # Strategy 5: Lexicon normalized lookup
-        if not gloss:
-            norm_lemma = normalize_greek(lemma)
-            if norm_lemma in lexicon_map:
-                gloss = lexicon_map[norm_lemma]
 
-        # Strategy 6: Word-based lookup in N1904
-        if not gloss and word in n1904_gloss_map:
-            gloss = n1904_gloss_map[word]
+def word_pattern_masks(words):
+    """
+    Match each word_pattern correction against a word column.
 
-        # Strategy 7: Proper name fallback
-        if not gloss and word and word[0].isupper():
-            gloss = "(name)"
+    The combined WORD_PATTERN_RE finds candidate rows in one pass; the
+    individual patterns are then only tested on those rows.
 
-        # Strategy 8: Rare word fallback
-        if not gloss:
-            gloss = "(rare)"
+    Returns:
+        List of boolean arrays, one per CORRECTIONS entry (None for entries
+        that are not word_pattern corrections)
+    """
+    import numpy as np
 
-        if gloss:
-            tr_df.at[idx, "gloss"] = gloss
-            filled_count += 1
+    candidates = words.str.contains(WORD_PATTERN_RE, na=False).to_numpy(dtype=bool)
+    candidate_words = words[candidates]
 
-    return tr_df, filled_count
+    masks = []
+    for correction in CORRECTIONS:
+        if correction["match_type"] != "word_pattern":
+            masks.append(None)
+            continue
+        mask = np.zeros(len(words), dtype=bool)
+        mask[candidates] = candidate_words.str.contains(correction["pattern"], regex=True).to_numpy(dtype=bool)
+        masks.append(mask)
+    return masks
 
 
 def apply_corrections(tr_df):
     """Apply known error corrections."""
     total_fixed = 0
 
-    for correction in CORRECTIONS:
+    pattern_masks = word_pattern_masks(tr_df["word"])
+
+    for correction, pattern_mask in zip(CORRECTIONS, pattern_masks):
         match_type = correction["match_type"]
         pattern = correction["pattern"]
 
         if match_type == "word_pattern":
-            mask = tr_df["word"].str.contains(pattern, na=False, regex=True)
+            mask = pattern_mask
         elif match_type == "lemma":
-            mask = tr_df["lemma"] == pattern
+            mask = (tr_df["lemma"] == pattern).to_numpy(dtype=bool)
         else:
             continue
 
@@ -312,7 +356,13 @@ def main(config=None):
     logger.info(f"  Final gloss coverage: {final_coverage:.1f}%")
 
     # Save
-    tr_df.to_parquet(tr_path)
+    tr_df.to_parquet(
+        tr_path,
+        row_group_size=65536,
+        compression="zstd",
+        compression_level=3,
+        use_dictionary=True,
+    )
     logger.info(f"Saved: {tr_path}")
 
     # Summary
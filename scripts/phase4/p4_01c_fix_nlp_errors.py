@@ -209,7 +209,13 @@ def main(config=None, dry_run=False):
     logger.info(f"  Total fixes: {total_fixes:,}")
 
     # Save
-    tr_df.to_parquet(tr_path)
+    tr_df.to_parquet(
+        tr_path,
+        row_group_size=65536,
+        compression="zstd",
+        compression_level=3,
+        use_dictionary=True,
+    )
     logger.info(f"Saved: {tr_path}")
 
     # Summary
@@ -255,7 +255,14 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
 
     # Save
     logger.info(f"Saving to: {complete_path}")
-    df.to_parquet(complete_path, index=False)
+    df.to_parquet(
+        complete_path,
+        index=False,
+        row_group_size=65536,
+        compression="zstd",
+        compression_level=3,
+        use_dictionary=True,
+    )
 
     # Report
     logger.info("\nFeature summary:")
@@ -24,7 +24,6 @@ Usage:
 
 import argparse
 import sys
-import unicodedata
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
@@ -66,13 +65,6 @@ SP_TO_CLS = {
 }
 
 
-def normalize_unicode(text: str) -> str:
-    """Apply Unicode NFC normalization."""
-    if not text:
-        return text
-    return unicodedata.normalize('NFC', text)
-
-
 def generate_word_id(book: str, chapter: int, verse: int, num: int) -> str:
     """
     Generate unique word ID in N1904 format.
@@ -101,14 +93,25 @@ def map_sp_to_cls(sp: str) -> str:
     return SP_TO_CLS.get(sp, sp)  # Return original if no mapping
 
 
+# Columns add_compat_features reads
+SOURCE_COLUMNS = ['book', 'chapter', 'verse', 'word_rank', 'word', 'after', 'sp']
+
+
 def add_compat_features(df, logger):
     """
     Add N1904-compatible features to the dataframe.
     """
+    import numpy as np
     import pandas as pd
 
+    # book and sp have few distinct values: per-value lookups are done once
+    # per category and broadcast through the codes
+    if not isinstance(df['book'].dtype, pd.CategoricalDtype):
+        df['book'] = df['book'].astype('category')
+    sp = df['sp'].astype('category')
+
     logger.info("Adding bookshort feature...")
-    # Book is already abbreviated in our data
+    # Book is already abbreviated in our data; shares book's codes
     df['bookshort'] = df['book']
 
     logger.info("Adding text feature...")
@@ -116,7 +119,7 @@ def add_compat_features(df, logger):
     df['text'] = df['word']
 
     logger.info("Adding normalized feature...")
-    df['normalized'] = df['word'].apply(normalize_unicode)
+    df['normalized'] = df['word'].str.normalize('NFC')
 
     logger.info("Adding trailer feature...")
     # trailer is same as after
@@ -126,30 +129,32 @@ def add_compat_features(df, logger):
     # num is word position in verse (1-based)
     df['num'] = df['word_rank']
 
+    chapter = df['chapter'].to_numpy(dtype='int64')
+    verse = df['verse'].to_numpy(dtype='int64')
+    word_rank = df['word_rank'].to_numpy(dtype='int64')
+
     logger.info("Adding ref feature...")
-    df['ref'] = df.apply(
-        lambda row: generate_ref(
-            row['book'],
-            int(row['chapter']),
-            int(row['verse']),
-            int(row['word_rank'])
-        ),
-        axis=1
+    # Same format as generate_ref: {book} {chapter}:{verse}!{num}
+    df['ref'] = (
+        df['book'].astype(str) + ' ' + df['chapter'].astype('int64').astype(str)
+        + ':' + df['verse'].astype('int64').astype(str)
+        + '!' + df['word_rank'].astype('int64').astype(str)
     )
 
     logger.info("Adding id feature...")
-    df['id'] = df.apply(
-        lambda row: generate_word_id(
-            row['book'],
-            int(row['chapter']),
-            int(row['verse']),
-            int(row['word_rank'])
-        ),
-        axis=1
-    )
+    # Same format as generate_word_id: n{book_num:02d}{chapter:03d}{verse:03d}{num:03d},
+    # packed into one integer and formatted once
+    for name, values in [('chapter', chapter), ('verse', verse), ('word_rank', word_rank)]:
+        if len(values) and not (0 <= values.min() and values.max() < 1000):
+            raise ValueError(f"{name} out of range for 3-digit word IDs")
+    category_nums = np.array([BOOK_NUM.get(b, 0) for b in df['book'].cat.categories] + [0])
+    book_num = category_nums[df['book'].cat.codes.to_numpy()]
+    code = book_num * 10**9 + chapter * 10**6 + verse * 10**3 + word_rank
+    df['id'] = 'n' + pd.Series(code, index=df.index).astype(str).str.zfill(11)
 
     logger.info("Adding cls feature...")
-    df['cls'] = df['sp'].apply(map_sp_to_cls)
+    # map_sp_to_cls runs once per distinct sp value
+    df['cls'] = sp.map(map_sp_to_cls).astype(object)
 
     return df
 
@@ -167,30 +172,30 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
         logger.info("[DRY RUN] Would add compat features: bookshort, text, normalized, trailer, num, ref, id, cls")
         return True
 
-    import pandas as pd
+    from scripts.utils.parquet_io import read_columns, write_with_columns
 
     # Check input
     if not complete_path.exists():
         logger.error(f"Input not found: {complete_path}")
         return False
 
-    # Load data
+    # Load data: only the source columns go through pandas
     logger.info(f"Loading data from: {complete_path}")
-    df = pd.read_parquet(complete_path)
+    table, df = read_columns(complete_path, SOURCE_COLUMNS)
     logger.info(f"Loaded {len(df)} words")
 
     # Check if features already exist
     new_features = ['bookshort', 'text', 'normalized', 'trailer', 'num', 'ref', 'id', 'cls']
-    existing = [f for f in new_features if f in df.columns]
+    existing = [f for f in new_features if f in table.column_names]
     if existing:
         logger.info(f"Features already exist (will be overwritten): {existing}")
 
     # Add features
     df = add_compat_features(df, logger)
 
-    # Save
+    # Save: new columns are spliced into the Arrow table
     logger.info(f"Saving to: {complete_path}")
-    df.to_parquet(complete_path, index=False)
+    write_with_columns(table, df, new_features, complete_path)
 
     # Report
     logger.info("\nFeature summary:")
@@ -31,14 +31,19 @@ from scripts.utils.config import load_config
 from scripts.utils.logging import ScriptLogger, get_logger
 
 
+LOOKUP_FEATURES = ['trans', 'domain', 'typems']
+
+
 def load_n1904_data(n1904_tf_path: str):
     """
-    Load N1904 TF data and build lookup structures.
+    Load N1904 TF data and build lookup tables.
 
     Returns:
-        - node_data: dict mapping node_id -> {trans, domain, typems}
-        - lemma_lookup: dict mapping (lemma, strong) -> {trans, domain, typems}
+        - node_df: DataFrame of trans, domain, typems indexed by node ID
+        - lemma_df: DataFrame of lemma, strong, trans, domain, typems for
+          N1904 words with a lemma, in node order
     """
+    import pandas as pd
     from tf.fabric import Fabric
 
     logger = get_logger(__name__)
@@ -47,106 +52,91 @@ def load_n1904_data(n1904_tf_path: str):
     TF = Fabric(locations=n1904_tf_path, silent='deep')
     api = TF.load('trans domain typems lemma strong', silent='deep')
 
-    node_data = {}
-    lemma_lookup = {}
-
-    for w in api.F.otype.s('word'):
-        trans = api.F.trans.v(w)
-        domain = api.F.domain.v(w)
-        typems = api.F.typems.v(w)
-        lemma = api.F.lemma.v(w)
-        strong = api.F.strong.v(w)
-
-        # Store by node ID
-        node_data[w] = {
-            'trans': trans,
-            'domain': domain,
-            'typems': typems,
-        }
-
-        # Build lemma lookup for TR-only words
-        # Use (lemma, strong) as primary key, lemma alone as fallback
-        if lemma:
-            if strong:
-                key = (lemma, strong)
-                if key not in lemma_lookup:
-                    lemma_lookup[key] = {
-                        'trans': trans,  # Use first occurrence
-                        'domain': domain,
-                        'typems': typems,
-                    }
-            # Also store by lemma alone (will be overwritten, keeps last value)
-            if lemma not in lemma_lookup:
-                lemma_lookup[lemma] = {
-                    'trans': trans,
-                    'domain': domain,
-                    'typems': typems,
-                }
-
-    logger.info(f"Loaded {len(node_data)} N1904 word nodes")
-    logger.info(f"Built lemma lookup with {len(lemma_lookup)} entries")
-
-    return node_data, lemma_lookup
-
-
-def add_lookup_features(df, node_data: dict, lemma_lookup: dict, logger):
+    # One pass over the word nodes, one list per feature
+    words = list(api.F.otype.s('word'))
+    features = {
+        name: [getattr(api.F, name).v(w) for w in words]
+        for name in ['lemma', 'strong', *LOOKUP_FEATURES]
+    }
+
+    node_df = pd.DataFrame(
+        {feat: features[feat] for feat in LOOKUP_FEATURES},
+        index=pd.Index(words, dtype='int64'),
+        dtype=object,
+    )
+
+    # Lookup for TR-only words: (lemma, strong) as primary key, lemma alone
+    # as fallback; add_lookup_features keeps the first occurrence of each key
+    lemma_df = pd.DataFrame(features, dtype=object)
+    lemma_df = lemma_df[[bool(lemma) for lemma in features['lemma']]].reset_index(drop=True)
+
+    logger.info(f"Loaded {len(node_df)} N1904 word nodes")
+    logger.info(f"Built lemma lookup from {len(lemma_df)} words with a lemma")
+
+    return node_df, lemma_df
+
+
+def add_lookup_features(df, node_df, lemma_df, logger):
     """
     Add trans, domain, typems features to the dataframe.
 
     Strategy:
     1. For aligned words: use n1904_node_id to get exact values
-    2. For TR-only words: lookup by (lemma, strong) or lemma
+    2. For TR-only words: lookup by (lemma, strong) or lemma, taking the
+       first N1904 word with that key
+
+    Each strategy is a single hash join of the key columns against an
+    index built from the lookup table.
     """
     import pandas as pd
     import numpy as np
 
-    # Initialize columns
-    df['trans'] = None
-    df['domain'] = None
-    df['typems'] = None
-
-    aligned_count = 0
-    lookup_count = 0
-    miss_count = 0
-
-    for idx, row in df.iterrows():
-        n1904_id = row.get('n1904_node_id')
-
-        if pd.notna(n1904_id):
-            # Aligned word - get directly from N1904
-            n1904_id = int(n1904_id)
-            if n1904_id in node_data:
-                data = node_data[n1904_id]
-                df.at[idx, 'trans'] = data['trans']
-                df.at[idx, 'domain'] = data['domain']
-                df.at[idx, 'typems'] = data['typems']
-                aligned_count += 1
-            else:
-                miss_count += 1
-        else:
-            # TR-only word - try lookup
-            lemma = row.get('lemma')
-            strong = row.get('strong')
-
-            data = None
-
-            # Try (lemma, strong) first
-            if lemma and strong:
-                key = (lemma, strong)
-                if key in lemma_lookup:
-                    data = lemma_lookup[key]
-
-            # Fall back to lemma alone
-            if data is None and lemma and lemma in lemma_lookup:
-                data = lemma_lookup[lemma]
-
-            if data:
-                df.at[idx, 'trans'] = data['trans']
-                df.at[idx, 'domain'] = data['domain']
-                df.at[idx, 'typems'] = data['typems']
-                lookup_count += 1
-            else:
-                miss_count += 1
+    n = len(df)
+    values = np.full((n, len(LOOKUP_FEATURES)), None, dtype=object)
+
+    # 1. Aligned words: join on n1904_node_id
+    n1904_ids = df['n1904_node_id']
+    aligned = n1904_ids.notna().to_numpy()
+    node_values = node_df[LOOKUP_FEATURES].to_numpy(dtype=object)
+    node_pos = node_df.index.get_indexer(n1904_ids[aligned].to_numpy(dtype='int64'))
+    rows = np.flatnonzero(aligned)
+    found = node_pos >= 0
+    values[rows[found]] = node_values[node_pos[found]]
+    aligned_count = int(found.sum())
+
+    # 2. TR-only words: join on (lemma, strong), then lemma alone
+    lemma = df['lemma']
+    strong = df['strong']
+    has_lemma = (lemma.notna() & (lemma != '')).to_numpy()
+    has_strong = (strong.notna() & (strong != '')).to_numpy()
+
+    with_strong = lemma_df[[bool(s) for s in lemma_df['strong']]]
+    pair_df = with_strong.drop_duplicates(subset=['lemma', 'strong'], keep='first')
+    lemma_only_df = lemma_df.drop_duplicates(subset=['lemma'], keep='first')
+
+    matched = np.zeros(n, dtype=bool)
+
+    rows = np.flatnonzero(~aligned & has_lemma & has_strong)
+    if len(pair_df) and len(rows):
+        pair_pos = pd.MultiIndex.from_frame(pair_df[['lemma', 'strong']]).get_indexer(
+            pd.MultiIndex.from_arrays([lemma.to_numpy()[rows], strong.to_numpy()[rows]])
+        )
+        found = pair_pos >= 0
+        values[rows[found]] = pair_df[LOOKUP_FEATURES].to_numpy(dtype=object)[pair_pos[found]]
+        matched[rows[found]] = True
+
+    rows = np.flatnonzero(~aligned & has_lemma & ~matched)
+    if len(lemma_only_df) and len(rows):
+        lemma_pos = pd.Index(lemma_only_df['lemma']).get_indexer(lemma.to_numpy()[rows])
+        found = lemma_pos >= 0
+        values[rows[found]] = lemma_only_df[LOOKUP_FEATURES].to_numpy(dtype=object)[lemma_pos[found]]
+        matched[rows[found]] = True
+
+    lookup_count = int(matched.sum())
+    miss_count = n - aligned_count - lookup_count
+
+    for j, feat in enumerate(LOOKUP_FEATURES):
+        df[feat] = values[:, j]
 
     logger.info(f"Features added:")
     logger.info(f"  From N1904 alignment: {aligned_count}")
@@ -170,7 +160,7 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
         logger.info("[DRY RUN] Would add lookup features: trans, domain, typems")
         return True
 
-    import pandas as pd
+    from scripts.utils.parquet_io import read_columns, write_with_columns
 
     # Check input
     if not complete_path.exists():
@@ -178,26 +168,27 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
         return False
 
     # Load N1904 data
-    node_data, lemma_lookup = load_n1904_data(n1904_tf_path)
+    node_df, lemma_df = load_n1904_data(n1904_tf_path)
 
-    # Load TR data
+    # Load TR data: only the lookup keys (and word, for the samples) go
+    # through pandas
     logger.info(f"Loading TR data from: {complete_path}")
-    df = pd.read_parquet(complete_path)
+    table, df = read_columns(complete_path, ['n1904_node_id', 'lemma', 'strong', 'word'])
     logger.info(f"Loaded {len(df)} words")
 
     # Check if features already exist
-    new_features = ['trans', 'domain', 'typems']
-    existing = [f for f in new_features if f in df.columns]
+    new_features = LOOKUP_FEATURES
+    existing = [f for f in new_features if f in table.column_names]
     if existing:
         logger.info(f"Features already exist (will be overwritten): {existing}")
 
     # Add features
     logger.info("Adding lookup features...")
-    df = add_lookup_features(df, node_data, lemma_lookup, logger)
+    df = add_lookup_features(df, node_df, lemma_df, logger)
 
-    # Save
+    # Save: new columns are spliced into the Arrow table
     logger.info(f"Saving to: {complete_path}")
-    df.to_parquet(complete_path, index=False)
+    write_with_columns(table, df, new_features, complete_path)
 
     # Report coverage
     logger.info("\nFeature coverage:")
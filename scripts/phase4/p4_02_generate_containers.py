@@ -35,67 +35,63 @@ def generate_section_containers(complete_df):
     Returns:
         DataFrame of container nodes
     """
+    import numpy as np
     import pandas as pd
 
     logger = get_logger(__name__)
 
-    containers = []
-
     # Get max word_id to start container IDs after words
     max_word_id = complete_df["word_id"].max()
-    next_id = max_word_id + 1
-
-    # Group by book
-    for book in complete_df["book"].unique():
-        book_df = complete_df[complete_df["book"] == book]
-        book_slots = book_df["word_id"].tolist()
-
-        book_node = {
-            "node_id": next_id,
-            "otype": "book",
-            "name": book,
-            "first_slot": min(book_slots),
-            "last_slot": max(book_slots),
-        }
-        containers.append(book_node)
-        next_id += 1
-
-        # Group by chapter within book
-        for chapter in sorted(book_df["chapter"].unique()):
-            chapter_df = book_df[book_df["chapter"] == chapter]
-            chapter_slots = chapter_df["word_id"].tolist()
-
-            chapter_node = {
-                "node_id": next_id,
-                "otype": "chapter",
-                "book": book,
-                "chapter": chapter,
-                "first_slot": min(chapter_slots),
-                "last_slot": max(chapter_slots),
-            }
-            containers.append(chapter_node)
-            next_id += 1
-
-            # Group by verse within chapter
-            for verse in sorted(chapter_df["verse"].unique()):
-                verse_df = chapter_df[chapter_df["verse"] == verse]
-                verse_slots = verse_df["word_id"].tolist()
-
-                verse_node = {
-                    "node_id": next_id,
-                    "otype": "verse",
-                    "book": book,
-                    "chapter": chapter,
-                    "verse": verse,
-                    "first_slot": min(verse_slots),
-                    "last_slot": max(verse_slots),
-                }
-                containers.append(verse_node)
-                next_id += 1
-
-    logger.info(f"Generated {len(containers)} section containers")
-
-    return pd.DataFrame(containers), next_id
+
+    # Group on book codes rather than strings
+    if not isinstance(complete_df["book"].dtype, pd.CategoricalDtype):
+        complete_df = complete_df.assign(book=complete_df["book"].astype("category"))
+
+    # One slot range per section, computed with a single groupby per level
+    levels = {
+        "book": ["book"],
+        "chapter": ["book", "chapter"],
+        "verse": ["book", "chapter", "verse"],
+    }
+    frames = []
+    for otype, keys in levels.items():
+        level_df = (
+            complete_df.groupby(keys, sort=False, observed=True)["word_id"]
+            .agg(["min", "max"])
+            .rename(columns={"min": "first_slot", "max": "last_slot"})
+            .reset_index()
+        )
+        level_df["otype"] = otype
+        frames.append(level_df)
+    sections = pd.concat(frames, ignore_index=True)
+
+    # Number containers depth-first: each book (in file order) is followed by
+    # its chapters, each chapter by its verses, in ascending order
+    # (cast first so nullable or Arrow-backed chapter/verse sort the same way)
+    chapters = sections["chapter"].astype("float64")
+    verses = sections["verse"].astype("float64")
+    book_rank = pd.Index(complete_df["book"].unique()).get_indexer(sections["book"])
+    chapter_key = chapters.fillna(-np.inf).to_numpy()
+    verse_key = verses.fillna(-np.inf).to_numpy()
+    order = np.lexsort((verse_key, chapter_key, book_rank))
+    sections, chapters, verses = sections.iloc[order], chapters.iloc[order], verses.iloc[order]
+
+    is_book = (sections["otype"] == "book").to_numpy()
+    containers_df = pd.DataFrame({
+        "node_id": np.arange(len(sections), dtype="int64") + max_word_id + 1,
+        "otype": sections["otype"].to_numpy(),
+        "name": sections["book"].astype(object).where(is_book).to_numpy(),
+        "first_slot": sections["first_slot"].to_numpy(),
+        "last_slot": sections["last_slot"].to_numpy(),
+        "book": sections["book"].astype(object).mask(is_book).to_numpy(),
+        "chapter": chapters.to_numpy(),
+        "verse": verses.to_numpy(),
+    })
+    next_id = max_word_id + 1 + len(containers_df)
+
+    logger.info(f"Generated {len(containers_df)} section containers")
+
+    return containers_df, next_id
 
 
 def main(config: dict = None, dry_run: bool = False) -> bool:
@@ -129,7 +125,14 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
 
     # Save
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    containers_df.to_parquet(output_path, index=False)
+    containers_df.to_parquet(
+        output_path,
+        index=False,
+        row_group_size=65536,
+        compression="zstd",
+        compression_level=3,
+        use_dictionary=True,
+    )
     logger.info(f"Saved to: {output_path}")
 
     # Summary
@@ -32,6 +32,9 @@ def build_parent_edges(complete_df) -> dict:
     Returns:
         dict: {child_slot: parent_slot} mapping
     """
+    import numpy as np
+    import pandas as pd
+
     logger = get_logger(__name__)
 
     # Sort and create slot mapping
@@ -39,34 +42,31 @@ def build_parent_edges(complete_df) -> dict:
         ["book", "chapter", "verse", "word_rank"]
     ).reset_index(drop=True)
 
-    slot_map = {row["word_id"]: idx + 1 for idx, row in complete_df.iterrows()}
-
-    edges = {}
-    root_count = 0
-    missing_parent_count = 0
-
-    for _, row in complete_df.iterrows():
-        child_slot = slot_map[row["word_id"]]
-        parent_id = row.get("parent")
-
-        # Skip if no parent (root word or missing)
-        if parent_id is None or str(parent_id) == "nan" or parent_id == "":
-            root_count += 1
-            continue
-
-        # Handle numeric parent IDs
-        try:
-            parent_id = int(float(parent_id))
-        except (ValueError, TypeError):
-            missing_parent_count += 1
-            continue
-
-        # Map parent to slot
-        if parent_id in slot_map:
-            parent_slot = slot_map[parent_id]
-            edges[child_slot] = parent_slot
-        else:
-            missing_parent_count += 1
+    # Slots are 1-based row positions; a repeated word_id maps to its last row
+    word_ids = complete_df["word_id"].to_numpy()
+    slot_index = pd.Index(word_ids)
+    slots = np.arange(1, len(word_ids) + 1)
+    if slot_index.has_duplicates:
+        last = ~slot_index.duplicated(keep="last")
+        slot_index = slot_index[last]
+        slots = slots[last]
+    child_slots = slots[slot_index.get_indexer(word_ids)]
+
+    # Roots have no parent (null, empty or "nan")
+    parent = complete_df["parent"]
+    is_root = (parent.isna() | parent.astype(str).isin(["nan", ""])).to_numpy()
+    root_count = int(is_root.sum())
+
+    # Numeric parent IDs, truncated like int(float(...)); unparseable values
+    # and IDs without a word become missing references
+    parent_ids = np.trunc(pd.to_numeric(parent.mask(is_root), errors="coerce").to_numpy(dtype="float64"))
+    parent_pos = np.full(len(parent_ids), -1)
+    numeric = ~np.isnan(parent_ids)
+    parent_pos[numeric] = slot_index.get_indexer(parent_ids[numeric])
+    found = parent_pos >= 0
+    missing_parent_count = int((~is_root & ~found).sum())
+
+    edges = dict(zip(child_slots[found].tolist(), slots[parent_pos[found]].tolist()))
 
     logger.info(f"Built {len(edges)} parent edges")
     logger.info(f"Root words (no parent): {root_count}")
@@ -82,16 +82,18 @@ def write_edge_file(edges: dict, output_path: Path):
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
+    header = (
+        "@edge\n"
+        "@description=parent (head) word in dependency tree\n"
+        "@valueType=int\n"
+        "\n"
+    )
+
+    # Edges sorted by child node, rendered into one string
+    body = "".join(f"{child}\t{parent}\n" for child, parent in sorted(edges.items()))
+
     with open(output_path, "w", encoding="utf-8") as f:
-        f.write("@edge\n")
-        f.write("@description=parent (head) word in dependency tree\n")
-        f.write("@valueType=int\n")
-        f.write("\n")
-
-        # Write edges sorted by child node
-        for child in sorted(edges.keys()):
-            parent = edges[child]
-            f.write(f"{child}\t{parent}\n")
+        f.write(header + body)
 
     logger.info(f"Wrote {len(edges)} edges to {output_path}")
 
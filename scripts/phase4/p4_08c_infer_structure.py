@@ -11,109 +11,136 @@ infer structure by:
    - Adjacent word context
 """
 
+import argparse
+import numpy as np
 import pandas as pd
 import json
 from pathlib import Path
 import sys
-from collections import defaultdict, Counter
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from scripts.utils.logging import ScriptLogger
 from scripts.utils.config import load_config
+from scripts.utils.aggregate import most_common_by_key
+from scripts.utils.cache import derived_table_cached
 from scripts.utils.tf_helpers import load_n1904
 
+# Columns of tr_structure_classified.parquet used here
+TR_COLUMNS = [
+    'word_id', 'book', 'chapter', 'verse', 'word', 'sp',
+    'n1904_node_id', 'structure_status',
+]
 
 def build_word_patterns(api, n1904: pd.DataFrame) -> dict:
     """
     Build usage patterns for each word form from N1904.
 
-    Returns dict mapping normalized word -> {
-        'phrase_types': Counter of phrase types this word appears in,
-        'functions': Counter of syntactic functions,
-        'typical_phrase_type': most common phrase type,
-        'sp': most common part of speech
+    Returns dict mapping lowercased word -> {
+        'typical_sp': most common part of speech (if any),
+        'typical_function': most common syntactic function (if any)
     }
+    Words with neither a part of speech nor a function are left out.
     """
-    patterns = defaultdict(lambda: {
-        'phrase_types': Counter(),
-        'functions': Counter(),
-        'sp': Counter()
-    })
-
-    for _, row in n1904.iterrows():
-        word = row.get('word', '').lower()
-        if not word:
-            continue
-
-        sp = row.get('sp')
-        function = row.get('function')
-
-        if sp:
-            patterns[word]['sp'][sp] += 1
-        if function:
-            patterns[word]['functions'][function] += 1
-
-    # Compute typical values
-    for word, data in patterns.items():
-        if data['sp']:
-            data['typical_sp'] = data['sp'].most_common(1)[0][0]
-        if data['functions']:
-            data['typical_function'] = data['functions'].most_common(1)[0][0]
-
-    return dict(patterns)
-
-
-def infer_phrase_type(word: str, sp: str, patterns: dict, context: dict) -> tuple:
-    """
-    Infer the likely phrase type and function for a word.
+    # Python's str.lower (object dtype) handles final sigma; Arrow's does not
+    words = n1904['word'].fillna('').astype(object).str.lower()
+    has_word = words != ''
+    words = words[has_word]
+
+    typical = {
+        'typical_sp': most_common_by_key(words, n1904.loc[has_word, 'sp']),
+        'typical_function': most_common_by_key(words, n1904.loc[has_word, 'function']),
+    }
 
-    Returns (phrase_type, function, confidence)
+    patterns = {}
+    for key, values in typical.items():
+        for word, value in values.items():
+            patterns.setdefault(word, {})[key] = value
+
+    return patterns
+
+
+def word_pattern_table(patterns: dict) -> pd.DataFrame:
+    """Word patterns as a DataFrame indexed by word, for caching."""
+    return pd.DataFrame.from_dict(
+        patterns, orient='index', columns=['typical_sp', 'typical_function'], dtype=object
+    )
+
+
+def word_patterns_from_table(table: pd.DataFrame) -> dict:
+    """Inverse of word_pattern_table(); missing values are left out."""
+    patterns = {}
+    for word, typical_sp, typical_function in table.itertuples(name=None):
+        pattern = {}
+        if pd.notna(typical_sp):
+            pattern['typical_sp'] = typical_sp
+        if pd.notna(typical_function):
+            pattern['typical_function'] = typical_function
+        patterns[word] = pattern
+    return patterns
+
+
+# POS-based fallback: lowercased sp -> (phrase_type, function, confidence)
+SP_INFERENCE = {
+    # Articles typically in NP
+    'art': ('NP', None, 0.8),
+    'det': ('NP', None, 0.8),
+    # Prepositions start PP
+    'prep': ('PP', 'Cmpl', 0.8),
+    'adp': ('PP', 'Cmpl', 0.8),
+    # Nouns in NP
+    'noun': ('NP', None, 0.75),
+    'n': ('NP', None, 0.75),
+    # Verbs in VP or predicate
+    'verb': (None, 'Pred', 0.75),
+    'v': (None, 'Pred', 0.75),
+    # Adjectives
+    'adj': ('AdjP', None, 0.7),
+    'a': ('AdjP', None, 0.7),
+    # Adverbs
+    'adv': ('AdvP', 'Cmpl', 0.7),
+    # Conjunctions often at clause boundaries
+    'conj': (None, None, 0.6),
+    'cconj': (None, None, 0.6),
+    'sconj': (None, None, 0.6),
+}
+
+
+def infer_phrase_types(words: pd.Series, sps: pd.Series, patterns: dict) -> pd.DataFrame:
     """
-    word_lower = word.lower()
-
-    # Check patterns from N1904
-    if word_lower in patterns:
-        pattern = patterns[word_lower]
-        typical_sp = pattern.get('typical_sp')
-        typical_func = pattern.get('typical_function')
-
-        # Higher confidence if we have good data
-        confidence = 0.85
-        return (None, typical_func, confidence)
+    Infer the likely phrase type and function for each word.
 
-    # Fall back to POS-based heuristics
-    if sp:
-        sp_lower = sp.lower() if sp else ''
+    Words with an N1904 usage pattern take its typical function; others
+    fall back to SP_INFERENCE, then to (None, None, 0.5).
 
-        # Articles typically in NP
-        if sp_lower in ['art', 'det']:
-            return ('NP', None, 0.8)
-
-        # Prepositions start PP
-        if sp_lower in ['prep', 'adp']:
-            return ('PP', 'Cmpl', 0.8)
-
-        # Nouns in NP
-        if sp_lower in ['noun', 'n']:
-            return ('NP', None, 0.75)
-
-        # Verbs in VP or predicate
-        if sp_lower in ['verb', 'v']:
-            return (None, 'Pred', 0.75)
-
-        # Adjectives
-        if sp_lower in ['adj', 'a']:
-            return ('AdjP', None, 0.7)
-
-        # Adverbs
-        if sp_lower in ['adv']:
-            return ('AdvP', 'Cmpl', 0.7)
-
-        # Conjunctions often at clause boundaries
-        if sp_lower in ['conj', 'cconj', 'sconj']:
-            return (None, None, 0.6)
-
-    return (None, None, 0.5)
+    Returns:
+        DataFrame aligned with words, with inferred_phrase_type,
+        inferred_function and inferred_confidence columns
+    """
+    # Python's str.lower (object dtype) handles final sigma; Arrow's does not
+    words_lower = words.astype(object).str.lower()
+    has_pattern = words_lower.isin(list(patterns)).to_numpy()
+    typical_function = pd.Series(
+        {word: pattern.get('typical_function') for word, pattern in patterns.items()}, dtype=object
+    ).reindex(words_lower).to_numpy(dtype=object)
+
+    sp_rows = pd.DataFrame.from_dict(
+        SP_INFERENCE, orient='index', columns=['phrase_type', 'function', 'confidence'], dtype=object
+    ).reindex(sps.astype(object).str.lower())
+    has_sp = sp_rows.index.isin(list(SP_INFERENCE)) & ~has_pattern
+
+    return pd.DataFrame({
+        'inferred_phrase_type': np.where(has_sp, sp_rows['phrase_type'].to_numpy(dtype=object), None),
+        'inferred_function': np.select(
+            [has_pattern, has_sp],
+            [typical_function, sp_rows['function'].to_numpy(dtype=object)],
+            None,
+        ),
+        'inferred_confidence': np.select(
+            [has_pattern, has_sp],
+            [0.85, sp_rows['confidence'].to_numpy(dtype=object)],
+            0.5,
+        ),
+    }, index=words.index, dtype=object).astype({'inferred_confidence': float})
 
 
 def process_infer_verse(
@@ -126,7 +153,8 @@ def process_infer_verse(
     Process a verse that needs inference for some words.
 
     Args:
-        tr_verse: DataFrame of TR words for this verse
+        tr_verse: DataFrame of TR words for this verse, including the
+            columns added by infer_phrase_types()
         n1904_structure: Structure data from direct transplant (or None)
         n1904_to_tr: N1904 node -> TR word_id mapping
         word_patterns: Word usage patterns from N1904
@@ -143,24 +171,25 @@ def process_infer_verse(
         'confidence': 0.0
     }
 
-    aligned_words = []
-    inferable_words = []
+    # Aligned words keep their N1904 structure; the rest need inference
+    aligned = tr_verse['n1904_node_id'].notna().to_numpy()
 
-    for _, row in tr_verse.iterrows():
-        word_id = row['word_id']
-        if pd.notna(row.get('n1904_node_id')):
-            aligned_words.append({
-                'word_id': word_id,
-                'n1904_node': int(row['n1904_node_id']),
-                'word': row['word'],
-                'sp': row.get('sp')
-            })
-        else:
+    inferable_words = []
+    columns = [
+        'word_id', 'word', 'sp', 'structure_status',
+        'inferred_phrase_type', 'inferred_function', 'inferred_confidence',
+    ]
+    rows = tr_verse[columns].itertuples(index=False, name=None)
+    for is_aligned, (word_id, word, sp, status, phrase_type, function, conf) in zip(aligned, rows):
+        if not is_aligned:
             inferable_words.append({
                 'word_id': word_id,
-                'word': row['word'],
-                'sp': row.get('sp'),
-                'status': row.get('structure_status')
+                'word': word,
+                'sp': sp,
+                'status': status,
+                'phrase_type': phrase_type,
+                'function': function,
+                'confidence': conf
             })
 
     # If we have N1904 structure for aligned words, use it as base
@@ -172,20 +201,13 @@ def process_infer_verse(
     # For inferable words, determine placement
     total_confidence = 0
     for inf_word in inferable_words:
-        phrase_type, function, conf = infer_phrase_type(
-            inf_word['word'],
-            inf_word['sp'],
-            word_patterns,
-            {'aligned': aligned_words}
-        )
-
         result['word_assignments'][inf_word['word_id']] = {
-            'inferred_phrase_type': phrase_type,
-            'inferred_function': function,
-            'confidence': conf,
+            'inferred_phrase_type': inf_word['phrase_type'],
+            'inferred_function': inf_word['function'],
+            'confidence': inf_word['confidence'],
             'source': 'inference'
         }
-        total_confidence += conf
+        total_confidence += inf_word['confidence']
 
     # Calculate average confidence
     if inferable_words:
@@ -196,26 +218,58 @@ def process_infer_verse(
     return result
 
 
-def main(config=None):
-    """Main entry point."""
+def main(config=None, use_cache: bool = True):
+    """
+    Main entry point.
+
+    Args:
+        config: Pipeline config
+        use_cache: Reuse the cached word pattern table. Its cache key only
+            covers n1904_words.parquet, so pass False (--fresh) after changing
+            build_word_patterns or the pattern table format.
+    """
     config = load_config()
 
     with ScriptLogger('p4_08c_infer_structure') as logger:
         # Load data
         logger.info("Loading data...")
-        tr = pd.read_parquet('data/intermediate/tr_structure_classified.parquet')
-        verse_stats = pd.read_parquet('data/intermediate/verse_structure_stats.parquet')
-        n1904 = pd.read_parquet('data/intermediate/n1904_words.parquet')
+        # Low-cardinality string columns are read as categoricals
+        tr = pd.read_parquet(
+            'data/intermediate/tr_structure_classified.parquet',
+            columns=TR_COLUMNS,
+            read_dictionary=['book', 'sp', 'structure_status']
+        )
+        verse_stats = pd.read_parquet(
+            'data/intermediate/verse_structure_stats.parquet',
+            columns=['book', 'chapter', 'verse', 'category']
+        )
 
         # Get verses needing inference (all words known, but not all aligned)
         infer_verses = verse_stats[verse_stats['category'] == 'transplant_infer']
         logger.info(f"Verses needing inference: {len(infer_verses):,}")
 
-        # Build word patterns from N1904
+        # Build word patterns from N1904, reusing the cached table while
+        # n1904_words.parquet is unchanged
         logger.info("Building word usage patterns from N1904...")
-        word_patterns = build_word_patterns(None, n1904)
+        n1904_path = Path('data/intermediate/n1904_words.parquet')
+
+        def build_pattern_table():
+            n1904 = pd.read_parquet(
+                n1904_path,
+                columns=['word', 'sp', 'function'],
+                read_dictionary=['sp', 'function']
+            )
+            return word_pattern_table(build_word_patterns(None, n1904))
+
+        pattern_table = derived_table_cached(
+            n1904_path, Path(config['paths']['cache']), 'word_patterns', build_pattern_table, use_cache
+        )
+        word_patterns = word_patterns_from_table(pattern_table)
         logger.info(f"  Patterns for {len(word_patterns):,} unique words")
 
+        # Infer placement for every TR word in one pass
+        tr = pd.concat([tr, infer_phrase_types(tr['word'], tr['sp'], word_patterns)], axis=1)
+
         # Load N1904 for structure extraction
         logger.info("Loading N1904 for structure...")
         TF = load_n1904(config)
@@ -239,9 +293,15 @@ def main(config=None):
             aligned['word_id']
         ))
 
+        # Partition TR words by verse once
+        tr_by_verse = dict(tuple(tr.groupby(['book', 'chapter', 'verse'], sort=False, observed=True)))
+        no_words = tr.iloc[0:0]
+
         # Process each verse
         all_structures = []
         confidence_sum = 0
+        total_inferred = 0
+        high_conf = med_conf = low_conf = 0
 
         logger.info("Processing verses...")
         for idx, row in infer_verses.iterrows():
@@ -250,9 +310,7 @@ def main(config=None):
             verse = int(row['verse'])
 
             # Get TR words for this verse
-            verse_tr = tr[(tr['book'] == book) &
-                         (tr['chapter'] == chapter) &
-                         (tr['verse'] == verse)]
+            verse_tr = tr_by_verse.get((book, chapter, verse), no_words)
 
             # Process verse
             structure = process_infer_verse(
@@ -267,7 +325,17 @@ def main(config=None):
             structure['verse'] = verse
 
             all_structures.append(structure)
-            confidence_sum += structure['confidence']
+
+            # Tally summary statistics as we go
+            confidence = structure['confidence']
+            confidence_sum += confidence
+            total_inferred += len(structure['word_assignments'])
+            if confidence >= 0.8:
+                high_conf += 1
+            elif confidence >= 0.6:
+                med_conf += 1
+            else:
+                low_conf += 1
 
             if len(all_structures) % 500 == 0:
                 logger.info(f"  Processed {len(all_structures):,} verses...")
@@ -276,21 +344,22 @@ def main(config=None):
         logger.info(f"\nProcessed {len(all_structures):,} verses")
         logger.info(f"Average confidence: {avg_confidence:.2%}")
 
-        # Count inferred words
-        total_inferred = sum(len(s['word_assignments']) for s in all_structures)
         logger.info(f"Total inferred word assignments: {total_inferred:,}")
 
         # Save results
         output_path = Path('data/intermediate/tr_structure_inferred.json')
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(all_structures, f, indent=2, ensure_ascii=False)
+        # Compact output: this file is only read back by p4_08e
+        try:
+            import orjson
+        except ImportError:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(all_structures, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(all_structures, option=orjson.OPT_NON_STR_KEYS))
         logger.info(f"\nSaved to: {output_path}")
 
         # Summary by confidence level
-        high_conf = sum(1 for s in all_structures if s['confidence'] >= 0.8)
-        med_conf = sum(1 for s in all_structures if 0.6 <= s['confidence'] < 0.8)
-        low_conf = sum(1 for s in all_structures if s['confidence'] < 0.6)
-
         logger.info(f"\nConfidence distribution:")
         logger.info(f"  High (>=80%): {high_conf:,} verses")
         logger.info(f"  Medium (60-80%): {med_conf:,} verses")
@@ -300,4 +369,12 @@ def main(config=None):
 
 
 if __name__ == '__main__':
-    sys.exit(main())
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--fresh', action='store_true',
+        help='Rebuild the cached N1904 word patterns (needed after code changes '
+             'to build_word_patterns, which the cache key does not track)'
+    )
+    args = parser.parse_args()
+
+    sys.exit(main(use_cache=not args.fresh))
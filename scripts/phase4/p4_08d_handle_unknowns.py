@@ -8,15 +8,18 @@ For the 2.8% of words not found in N1904:
 3. Default proper names to NP
 """
 
+import numpy as np
 import pandas as pd
 import json
 from pathlib import Path
 import sys
-import re
+import unicodedata
 from collections import Counter
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from scripts.utils.aggregate import most_common_by_key
 from scripts.utils.logging import ScriptLogger
+from scripts.utils.parquet_io import read_available_columns
 
 
 # Elision mappings: elided form -> (full form, phrase_type, function)
@@ -53,6 +56,12 @@ ELISION_MAP = {
     "μήτ᾽": ("μήτε", None, None),
 }
 
+# ELISION_MAP keyed by NFC-normalized lowercase form
+_ELISION_LOOKUP = {
+    unicodedata.normalize('NFC', form).lower(): value
+    for form, value in ELISION_MAP.items()
+}
+
 # Strong's numbers for common prepositions/conjunctions
 STRONG_PHRASE_MAP = {
     # Prepositions -> PP
@@ -135,23 +144,16 @@ def is_proper_name(word: str, strong: str) -> bool:
     if word and word[0].isupper():
         return True
 
-    # Check Strong's number pattern (names often have specific ranges)
-    # Most Hebrew/Aramaic names are in certain ranges
-    if strong:
-        num = int(re.sub(r'[^0-9]', '', strong) or 0)
-        # This is a heuristic - proper names often cluster
-        # G2424 = Ἰησοῦς, G5547 = Χριστός, etc.
-
     return False
 
 
 def get_full_form(word: str) -> str:
     """Get the full (non-elided) form of a word."""
-    word_lower = word.lower()
+    word_lower = unicodedata.normalize('NFC', word).lower()
 
     # Check direct mapping
-    if word_lower in ELISION_MAP:
-        return ELISION_MAP[word_lower]
+    if word_lower in _ELISION_LOOKUP:
+        return _ELISION_LOOKUP[word_lower]
 
     # Check with original case preserved
     if word in ELISION_MAP:
@@ -180,129 +182,133 @@ def build_strong_to_phrase_map(n1904: pd.DataFrame) -> dict:
         'is_name': whether it's typically a proper name
     }
     """
-    strong_data = {}
-
-    for _, row in n1904.iterrows():
-        strong = row.get('strong')
-        if not strong:
-            continue
-
-        if strong not in strong_data:
-            strong_data[strong] = {
-                'functions': Counter(),
-                'sp': Counter(),
-                'words': []
-            }
-
-        function = row.get('function')
-        sp = row.get('sp')
-        word = row.get('word', '')
-
-        if function:
-            strong_data[strong]['functions'][function] += 1
-        if sp:
-            strong_data[strong]['sp'][sp] += 1
-        if word:
-            strong_data[strong]['words'].append(word)
-
-    # Compute typical values
-    result = {}
-    for strong, data in strong_data.items():
-        result[strong] = {
-            'typical_function': data['functions'].most_common(1)[0][0] if data['functions'] else None,
-            'typical_sp': data['sp'].most_common(1)[0][0] if data['sp'] else None,
-            'sample_word': data['words'][0] if data['words'] else None,
-            'is_name': data['sp'].get('noun', 0) > 0 and any(w[0].isupper() for w in data['words'][:5] if w)
-        }
-
-    return result
-
-
-def process_unknown_word(
-    word: str,
-    strong: str,
-    morph: str,
-    strong_to_phrase: dict,
-    n1904_words: set
-) -> dict:
+    if 'strong' not in n1904:
+        return {}
+
+    strongs = n1904['strong']
+    n1904 = n1904[(strongs.notna() & (strongs != '')).to_numpy()]
+    strongs = n1904['strong']
+
+    # Non-empty words, in row order, per Strong's number
+    words = n1904['word'].fillna('').astype(object)
+    has_word = (words != '').to_numpy()
+    word_rows = pd.DataFrame({'strong': strongs[has_word], 'word': words[has_word]})
+    sample_word = word_rows.groupby('strong', sort=False)['word'].first()
+    first_five = word_rows.groupby('strong', sort=False).head(5)
+    capitalized = first_five['word'].str[0].str.isupper().groupby(first_five['strong'], sort=False).any()
+
+    has_noun = (n1904['sp'] == 'noun').fillna(False).groupby(strongs, sort=False).any()
+
+    summary = pd.DataFrame(index=pd.Index(strongs.unique()))
+    summary['typical_function'] = most_common_by_key(strongs, n1904['function'])
+    summary['typical_sp'] = most_common_by_key(strongs, n1904['sp'])
+    summary['sample_word'] = sample_word
+    summary['is_name'] = has_noun & capitalized.reindex(summary.index, fill_value=False)
+    summary = summary.astype(object).where(summary.notna(), None)
+    summary['is_name'] = summary['is_name'].astype(bool)
+
+    return summary.to_dict('index')
+
+
+def resolve_unknown_words(
+    unknown_forms: pd.DataFrame,
+    word_to_morph: pd.Series,
+    strong_to_phrase: dict
+) -> list:
     """
-    Determine structure assignment for an unknown word.
-
-    Returns dict with:
-    - resolved_form: the matched/resolved form
-    - phrase_type: inferred phrase type
-    - function: inferred function
-    - confidence: confidence score
-    - method: how it was resolved
-    """
-    result = {
-        'original': word,
-        'resolved_form': None,
-        'phrase_type': None,
-        'function': None,
-        'confidence': 0.5,
-        'method': 'unknown'
-    }
-
-    word_lower = word.lower()
-
-    # 1. Try elision mapping (with phrase type info)
-    if word_lower in ELISION_MAP:
-        full_form, phrase_type, function = ELISION_MAP[word_lower]
-        result['resolved_form'] = full_form
-        result['phrase_type'] = phrase_type
-        result['function'] = function
-        result['method'] = 'elision_map'
-        result['confidence'] = 0.95
-        return result
-
-    # 2. Try Strong's phrase mapping
-    if strong and strong in STRONG_PHRASE_MAP:
-        phrase_type, function = STRONG_PHRASE_MAP[strong]
-        result['phrase_type'] = phrase_type
-        result['function'] = function
-        result['method'] = 'strong_phrase_map'
-        result['confidence'] = 0.90
-        return result
-
-    # 3. Try N1904 Strong's data lookup
-    if strong and strong in strong_to_phrase:
-        info = strong_to_phrase[strong]
-        result['function'] = info.get('typical_function')
-        result['typical_sp'] = info.get('typical_sp')
-
-        if info.get('is_name'):
-            result['phrase_type'] = 'NP'
-            result['function'] = result['function'] or 'Appo'
-            result['method'] = 'strong_name'
-            result['confidence'] = 0.9
-            return result
-        elif result['function']:
-            result['method'] = 'strong_lookup'
-            result['confidence'] = 0.85
-            return result
-
-    # 4. Check if proper name by capitalization
-    if word and word[0].isupper():
-        result['phrase_type'] = 'NP'
-        result['method'] = 'capital_name'
-        result['confidence'] = 0.85
-        return result
+    Determine structure assignments for all unknown word forms.
 
-    # 5. Try morph code inference
-    phrase_type, function, conf = infer_from_morph(morph)
-    if conf > 0:
-        result['phrase_type'] = phrase_type
-        result['function'] = function
-        result['confidence'] = conf
-        result['method'] = 'morph_inference'
-        return result
+    Each form is resolved by the first method that applies, in order:
+    elision map, Strong's phrase map, N1904 Strong's lookup (name or
+    typical function), capitalization, morph code inference, default.
 
-    # 6. Default handling
-    result['method'] = 'default'
-    result['confidence'] = 0.5
+    Args:
+        unknown_forms: DataFrame with word, strong and count columns
+        word_to_morph: Morph code per TR word form (indexed by word)
+        strong_to_phrase: Output of build_strong_to_phrase_map()
 
-    return result
+    Returns:
+        List of dicts with original, resolved_form, phrase_type, function,
+        confidence, method, count, strong and morph (plus typical_sp when
+        the Strong's number is in strong_to_phrase)
+    """
+    words = unknown_forms['word'].astype(object)
+    strongs = unknown_forms['strong']
+
+    # 1. Elision mapping
+    elision = pd.DataFrame.from_dict(
+        _ELISION_LOOKUP, orient='index', columns=['resolved_form', 'phrase_type', 'function'], dtype=object
+    ).reindex(words.str.normalize('NFC').str.lower())
+    is_elision = elision.index.isin(list(_ELISION_LOOKUP))
+
+    # 2. Strong's phrase mapping
+    strong_map = pd.DataFrame.from_dict(
+        STRONG_PHRASE_MAP, orient='index', columns=['phrase_type', 'function'], dtype=object
+    ).reindex(strongs)
+    is_strong_map = strongs.isin(list(STRONG_PHRASE_MAP)).to_numpy()
+
+    # 3. N1904 Strong's data lookup
+    info = pd.DataFrame.from_dict(
+        strong_to_phrase, orient='index', columns=['typical_function', 'typical_sp', 'is_name'], dtype=object
+    ).reindex(strongs)
+    has_info = strongs.isin(list(strong_to_phrase)).to_numpy()
+    typical_function = info['typical_function'].to_numpy(dtype=object)
+    is_name = has_info & info['is_name'].fillna(False).to_numpy(dtype=bool)
+    has_function = has_info & typical_function.astype(bool)
+
+    # 4. Capitalized words are proper names
+    is_capital = words.str[:1].str.isupper().fillna(False).to_numpy(dtype=bool)
+
+    # 5. Morph code inference, once per distinct code
+    morphs = words.map(word_to_morph).astype(object).where(words.isin(word_to_morph.index), None)
+    codes, uniques = pd.factorize(morphs)
+    inferred = [infer_from_morph(m) for m in uniques] + [infer_from_morph(None)]
+    morph_phrase, morph_function, morph_conf = (np.array(v, dtype=object)[codes] for v in zip(*inferred))
+    is_morph = morph_conf.astype(float) > 0
+
+    conditions = [
+        is_elision,
+        is_strong_map,
+        is_name,
+        has_function,
+        is_capital,
+        is_morph,
+    ]
+    # Rows that fall through the Strong's lookup keep its typical function
+    fallthrough_function = np.where(has_info, typical_function, None)
+    strong_name_function = np.where(has_function, typical_function, 'Appo')
+
+    results = pd.DataFrame({
+        'original': words.to_numpy(),
+        'resolved_form': np.where(is_elision, elision['resolved_form'].to_numpy(dtype=object), None),
+        'phrase_type': np.select(conditions, [
+            elision['phrase_type'].to_numpy(dtype=object),
+            strong_map['phrase_type'].to_numpy(dtype=object),
+            'NP', None, 'NP', morph_phrase,
+        ], None),
+        'function': np.select(conditions, [
+            elision['function'].to_numpy(dtype=object),
+            strong_map['function'].to_numpy(dtype=object),
+            strong_name_function, typical_function, fallthrough_function, morph_function,
+        ], fallthrough_function),
+        'confidence': np.select(conditions, [0.95, 0.90, 0.9, 0.85, 0.85, morph_conf], 0.5).astype(float),
+        'method': np.select(conditions, [
+            'elision_map', 'strong_phrase_map', 'strong_name', 'strong_lookup',
+            'capital_name', 'morph_inference',
+        ], 'default'),
+        'typical_sp': info['typical_sp'].to_numpy(dtype=object),
+        'count': unknown_forms['count'].to_numpy(),
+        'strong': strongs.to_numpy(dtype=object),
+        'morph': morphs.to_numpy(),
+    }, dtype=object)
+
+    records = results.to_dict('records')
+    has_typical_sp = has_info & ~is_elision & ~is_strong_map
+    for record, keep in zip(records, has_typical_sp):
+        if not keep:
+            del record['typical_sp']
+
+    return records
 
 
 def infer_from_morph(morph: str) -> tuple:
@@ -388,9 +394,15 @@ def main(config=None):
     with ScriptLogger('p4_08d_handle_unknowns') as logger:
         # Load data
         logger.info("Loading data...")
-        unknown_forms = pd.read_csv('data/intermediate/unknown_word_forms.csv')
-        n1904 = pd.read_parquet('data/intermediate/n1904_words.parquet')
-        tr = pd.read_parquet('data/intermediate/tr_structure_classified.parquet')
+        unknown_forms = pd.read_csv(
+            'data/intermediate/unknown_word_forms.csv', usecols=['word', 'strong', 'count']
+        )
+        # Low-cardinality string columns are read as categoricals
+        n1904 = read_available_columns(
+            Path('data/intermediate/n1904_words.parquet'),
+            ['word', 'sp', 'function', 'strong'],
+            read_dictionary=['sp', 'function']
+        )
 
         logger.info(f"Unknown forms to process: {len(unknown_forms):,}")
         logger.info(f"Total unknown occurrences: {unknown_forms['count'].sum():,}")
@@ -400,38 +412,28 @@ def main(config=None):
         strong_to_phrase = build_strong_to_phrase_map(n1904)
         logger.info(f"  {len(strong_to_phrase):,} Strong's numbers mapped")
 
-        # Build N1904 word set
-        n1904_words = set(n1904['word'].str.lower().dropna())
-        logger.info(f"  {len(n1904_words):,} unique N1904 word forms")
-
         # Load TR data to get morph codes
-        tr = pd.read_parquet('data/intermediate/tr_structure_classified.parquet')
+        tr = read_available_columns(
+            Path('data/intermediate/tr_structure_classified.parquet'),
+            ['word', 'morph', 'structure_status'],
+            read_dictionary=['structure_status']
+        )
         unknown_tr = tr[tr['structure_status'] == 'unknown']
 
-        # Build word -> morph lookup
-        word_to_morph = {}
-        for _, row in unknown_tr.iterrows():
-            word = row['word']
-            if word not in word_to_morph:
-                word_to_morph[word] = row.get('morph')
+        # Build word -> morph lookup (first occurrence of each word)
+        first_rows = unknown_tr.drop_duplicates('word')
+        if 'morph' in first_rows:
+            word_to_morph = first_rows.set_index('word')['morph']
+        else:
+            word_to_morph = pd.Series(None, index=first_rows['word'], dtype=object)
 
         # Process each unknown form
         logger.info("Processing unknown forms...")
-        results = []
-        method_counts = Counter()
-
-        for _, row in unknown_forms.iterrows():
-            word = row['word']
-            strong = row['strong']
-            count = row['count']
-            morph = word_to_morph.get(word)
+        results = resolve_unknown_words(unknown_forms, word_to_morph, strong_to_phrase)
 
-            result = process_unknown_word(word, strong, morph, strong_to_phrase, n1904_words)
-            result['count'] = count
-            result['strong'] = strong
-            result['morph'] = morph
-            results.append(result)
-            method_counts[result['method']] += count
+        method_counts = Counter()
+        for result in results:
+            method_counts[result['method']] += result['count']
 
         # Summary
         logger.info("\nResolution methods (by occurrence count):")
@@ -452,8 +454,15 @@ def main(config=None):
 
         # Save results
         output_path = Path('data/intermediate/unknown_word_resolutions.json')
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        # Compact output: this file is only read back by p4_08e
+        try:
+            import orjson
+        except ImportError:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(results))
         logger.info(f"\nSaved to: {output_path}")
 
         # Also save as CSV for review
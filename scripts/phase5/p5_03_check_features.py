@@ -34,14 +34,16 @@ def count_feature_values(tf_dir: Path, feature_name: str) -> int:
         if not feat_path.exists():
             return 0
 
-    count = 0
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
     with open(feat_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("@"):
-                count += 1
+        text = f.read()
 
-    return count
+    # Data lines are the non-blank lines outside the @ header
+    lines = pc.utf8_trim_whitespace(pc.split_pattern(pa.array([text]), "\n").flatten())
+    is_data = pc.and_(pc.not_equal(lines, ""), pc.invert(pc.starts_with(lines, "@")))
+    return pc.sum(is_data).as_py()
 
 
 def main(config: dict = None, dry_run: bool = False) -> bool:
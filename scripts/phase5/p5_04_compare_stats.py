@@ -33,17 +33,20 @@ def load_feature_distribution(tf_dir: Path, feature: str) -> dict:
         if not feat_path.exists():
             return dist
 
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
     with open(feat_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("@"):
-                continue
-            parts = line.split("\t")
-            if len(parts) == 2:
-                value = parts[1]
-                dist[value] = dist.get(value, 0) + 1
+        text = f.read()
+
+    lines = pc.utf8_trim_whitespace(pc.split_pattern(pa.array([text]), "\n").flatten())
+    lines = lines.filter(pc.and_(pc.not_equal(lines, ""), pc.invert(pc.starts_with(lines, "@"))))
 
-    return dist
+    # Only "node<TAB>value" lines are counted; values keep first-seen order
+    pairs = lines.filter(pc.equal(pc.count_substring(lines, "\t"), 1))
+    values = pc.list_element(pc.split_pattern(pairs, "\t", max_splits=1), 1)
+    counts = pc.value_counts(values)
+    return dict(zip(counts.field("values").to_pylist(), counts.field("counts").to_pylist()))
 
 
 def main(config: dict = None, dry_run: bool = False) -> bool:
@@ -73,8 +76,8 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
     logger.info(f"\nTotal words: {len(complete_df):,}")
     logger.info(f"Unique lemmas: {complete_df['lemma'].nunique():,}")
     logger.info(f"Books: {complete_df['book'].nunique()}")
-    logger.info(f"Chapters: {len(complete_df.groupby(['book', 'chapter']))}")
-    logger.info(f"Verses: {len(complete_df.groupby(['book', 'chapter', 'verse']))}")
+    logger.info(f"Chapters: {len(complete_df.groupby(['book', 'chapter'], observed=True))}")
+    logger.info(f"Verses: {len(complete_df.groupby(['book', 'chapter', 'verse'], observed=True))}")
 
     # Source distribution
     logger.info("\nSyntax Source:")
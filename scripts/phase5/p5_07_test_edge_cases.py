@@ -46,7 +46,7 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
 
     # Test 1: Longest verses
     logger.info("\n1. Longest verses (by word count):")
-    verse_lengths = complete_df.groupby(["book", "chapter", "verse"]).size()
+    verse_lengths = complete_df.groupby(["book", "chapter", "verse"], observed=True).size()
     longest = verse_lengths.nlargest(5)
     for (book, ch, vs), count in longest.items():
         logger.info(f"   {book} {ch}:{vs} - {count} words")
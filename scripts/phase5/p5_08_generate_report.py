@@ -60,8 +60,8 @@ def main(config: dict = None, dry_run: bool = False) -> bool:
         f.write("## Dataset Summary\n\n")
         f.write(f"- **Total words:** {len(complete_df):,}\n")
         f.write(f"- **Total books:** {complete_df['book'].nunique()}\n")
-        f.write(f"- **Total chapters:** {len(complete_df.groupby(['book', 'chapter']))}\n")
-        f.write(f"- **Total verses:** {len(complete_df.groupby(['book', 'chapter', 'verse']))}\n")
+        f.write(f"- **Total chapters:** {len(complete_df.groupby(['book', 'chapter'], observed=True))}\n")
+        f.write(f"- **Total verses:** {len(complete_df.groupby(['book', 'chapter', 'verse'], observed=True))}\n")
         f.write(f"- **Unique lemmas:** {complete_df['lemma'].nunique():,}\n\n")
 
         f.write("## Syntax Source\n\n")
@@ -0,0 +1,30 @@
+"""
+Grouped aggregation helpers for the TR Text-Fabric pipeline.
+"""
+
+
+def most_common_by_key(keys: "pd.Series", values: "pd.Series") -> "pd.Series":
+    """
+    Most common non-empty value per key.
+
+    Ties go to the value seen first, as with Counter.most_common.
+
+    Args:
+        keys: Grouping key for each row
+        values: Value for each row, aligned with keys
+
+    Returns:
+        Series of the most common value, indexed by key
+    """
+    import pandas as pd
+
+    valid = values.notna() & (values != '')
+    counts = (
+        pd.DataFrame({'key': keys[valid], 'value': values[valid]})
+        .groupby(['key', 'value'], sort=False, observed=True)
+        .size()
+        .reset_index(name='n')
+        .sort_values('n', ascending=False, kind='stable')
+        .drop_duplicates('key')
+    )
+    return counts.set_index('key')['value']
@@ -0,0 +1,120 @@
+"""
+On-disk read cache for the TR Text-Fabric pipeline.
+
+Keeps an uncompressed Feather (Arrow IPC) copy of parquet inputs so repeated
+runs over unchanged files skip parquet decoding, and parquet copies of
+tables derived from an input so they are only rebuilt when it changes.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Callable
+
+from .logging import get_logger
+
+
+def _cache_key(path: Path) -> str:
+    """Cache file prefix for a source path (independent of its contents)."""
+    return hashlib.sha1(str(path.resolve()).encode("utf-8")).hexdigest()
+
+
+def read_parquet_cached(path: Path, cache_dir: Path, use_cache: bool = True) -> "pd.DataFrame":
+    """
+    Read a parquet file through a Feather copy keyed by path, mtime and size.
+
+    A cached copy is reused while the source file's mtime and size are
+    unchanged; otherwise it is rebuilt and older copies of the same source
+    are removed.
+
+    Args:
+        path: Parquet file to read
+        cache_dir: Directory holding the Feather copies
+        use_cache: If False, read the parquet file directly
+
+    Returns:
+        DataFrame with the same dtypes pd.read_parquet(path) would give
+    """
+    import pandas as pd
+
+    path = Path(path)
+    if not use_cache:
+        return pd.read_parquet(path)
+
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    logger = get_logger(__name__)
+
+    stat = path.stat()
+    prefix = _cache_key(path)
+    cache_path = Path(cache_dir) / f"{prefix}_{stat.st_mtime_ns}_{stat.st_size}.feather"
+
+    if cache_path.exists():
+        logger.debug(f"Cache hit for {path.name}: {cache_path.name}")
+        return pd.read_feather(cache_path)
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    for stale in cache_path.parent.glob(f"{prefix}_*.feather"):
+        stale.unlink()
+
+    # Write the Arrow table as read from parquet, so the pandas conversion on
+    # a cache hit is exactly the one read_parquet performs
+    table = pq.read_table(path)
+    tmp_path = cache_path.with_suffix(".tmp")
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    tmp_path.replace(cache_path)
+    logger.debug(f"Cached {path.name} as {cache_path.name}")
+
+    return pd.read_feather(cache_path)
+
+
+def derived_table_cached(
+    source: Path,
+    cache_dir: Path,
+    name: str,
+    build: Callable[[], "pd.DataFrame"],
+    use_cache: bool = True,
+) -> "pd.DataFrame":
+    """
+    Return a table derived from a source file, rebuilding it only when the source changes.
+
+    The table is stored as parquet under a name keyed by the source path,
+    mtime and size; older copies for the same source are removed.
+
+    Args:
+        source: File the table is derived from
+        cache_dir: Directory holding the cached tables
+        name: Prefix distinguishing tables derived from the same source
+        build: Called with no arguments to build the table on a cache miss
+        use_cache: If False, always call build()
+
+    Returns:
+        DataFrame as written by build(), read back from parquet
+    """
+    import pandas as pd
+
+    if not use_cache:
+        return build()
+
+    logger = get_logger(__name__)
+
+    source = Path(source)
+    stat = source.stat()
+    prefix = f"{name}_{_cache_key(source)}"
+    cache_path = Path(cache_dir) / f"{prefix}_{stat.st_mtime_ns}_{stat.st_size}.parquet"
+
+    if cache_path.exists():
+        logger.debug(f"Cache hit for {name} from {source.name}: {cache_path.name}")
+        return pd.read_parquet(cache_path)
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    for stale in cache_path.parent.glob(f"{prefix}_*.parquet"):
+        stale.unlink()
+
+    # Return the table as read back, so hits and misses give the same dtypes
+    tmp_path = cache_path.with_suffix(".tmp")
+    build().to_parquet(tmp_path)
+    tmp_path.replace(cache_path)
+    logger.debug(f"Cached {name} from {source.name} as {cache_path.name}")
+
+    return pd.read_parquet(cache_path)
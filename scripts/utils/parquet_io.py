@@ -0,0 +1,85 @@
+"""
+Parquet helpers for the TR Text-Fabric pipeline.
+
+Feature scripts that add a few columns to a large table read only the
+columns they need into pandas and splice the results back into the Arrow
+table, so untouched columns are never converted to pandas and back.
+"""
+
+from pathlib import Path
+from typing import List
+
+
+def read_columns(path: Path, columns: List[str]):
+    """
+    Read a parquet file as an Arrow table plus a pandas view of some columns.
+
+    Args:
+        path: Parquet file to read
+        columns: Columns to convert to pandas
+
+    Returns:
+        Tuple of (full pyarrow.Table, DataFrame of the requested columns)
+    """
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path)
+    return table, table.select(columns).to_pandas()
+
+
+def read_available_columns(path: Path, columns: List[str], **kwargs) -> "pd.DataFrame":
+    """
+    Read the requested columns of a parquet file, skipping any it lacks.
+
+    Args:
+        path: Parquet file to read
+        columns: Columns to read, some of which may be optional
+        **kwargs: Passed on to pd.read_parquet (e.g. read_dictionary)
+
+    Returns:
+        DataFrame of the requested columns present in the file
+    """
+    import pandas as pd
+    import pyarrow.parquet as pq
+
+    names = set(pq.read_schema(path).names)
+    return pd.read_parquet(path, columns=[name for name in columns if name in names], **kwargs)
+
+
+def write_with_columns(table, df, columns: List[str], path: Path) -> "pa.Table":
+    """
+    Replace or append DataFrame columns on an Arrow table and write it out.
+
+    Existing columns keep their position; new ones are appended. The pandas
+    schema metadata is dropped because it would describe the old columns.
+
+    Args:
+        table: pyarrow.Table read by read_columns()
+        df: DataFrame holding the new column values, aligned with table rows
+        columns: Names of the columns in df to write into the table
+        path: Parquet file to write
+
+    Returns:
+        The updated pyarrow.Table
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    for name in columns:
+        array = pa.Array.from_pandas(df[name])
+        index = table.schema.get_field_index(name)
+        if index >= 0:
+            table = table.set_column(index, name, array)
+        else:
+            table = table.append_column(name, array)
+
+    table = table.replace_schema_metadata(None)
+    pq.write_table(
+        table,
+        path,
+        row_group_size=65536,
+        compression="zstd",
+        compression_level=3,
+        use_dictionary=True,
+    )
+    return table